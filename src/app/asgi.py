@@ -21,6 +21,8 @@ from starlette.responses import JSONResponse, PlainTextResponse, Response
 
 from .config import load_settings, SettingsError
 from .server import build_server, _build_websocket_app
+from .server_components.relay import build_response_relay
+from .server_components.response_handler import build_frontend_dispatcher
 from .ai_client import AIWebhookClient
 from .swagger import openapi_json_handler, swagger_ui_handler
 
@@ -58,13 +60,16 @@ def create_app(env_file: Optional[str] = None) -> Starlette:
         logger.warning("Failed to load settings for ASGI app: %s", exc)
         return _make_fallback_app(exc)
 
-    server = build_server(settings)
+    # The FastMCP tools and the HTTP routes share one dispatcher and relay; the app lifespan closes them.
+    dispatcher = build_frontend_dispatcher(settings)
+    relay = build_response_relay(settings)
+    server = build_server(settings, dispatcher=dispatcher, relay=relay)
     client = AIWebhookClient(
         str(settings.ai_webhook_url),
         api_key=settings.ai_api_key,
         timeout=settings.ai_timeout,
     )
-    return _build_websocket_app(server, settings, client)
+    return _build_websocket_app(server, settings, client, dispatcher=dispatcher, relay=relay)
 
 
 # Allow callers to override via ENV_FILE if they want to load a dotenv file
@@ -4,9 +4,10 @@ from __future__ import annotations
 
 from typing import Sequence
 
-from starlette.responses import JSONResponse
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from .responses import ORJSONResponse
+
 
 class BearerAuthMiddleware:
     """ASGI middleware that enforces Bearer auth on HTTP and WebSocket routes."""
@@ -23,7 +24,7 @@ class BearerAuthMiddleware:
         self.app = app
         self.enabled = enabled
         self.default_token = default_token
-        self.exempt_paths = {self._normalize_path(path) for path in (exempt_paths or [])}
+        self.exempt_paths = frozenset(self._normalize_path(path) for path in (exempt_paths or ()))
         self.route_tokens = self._prepare_route_tokens(route_tokens or {})
 
     @staticmethod
@@ -95,7 +96,7 @@ class BearerAuthMiddleware:
             return
 
         if scope["type"] == "http":
-            response = JSONResponse(
+            response = ORJSONResponse(
                 {"error": "Unauthorized"},
                 status_code=401,
                 headers={"WWW-Authenticate": "Bearer"},
@@ -9,7 +9,7 @@ import typer
 
 from .ai_client import AIWebhookError
 from .config import SettingsError, load_settings
-from .server import run_stdio, run_websocket, run_memory_websocket
+from .server import install_uvloop, run_stdio, run_websocket, run_memory_websocket
 from .memory_api import run_memory_stdio
 
 app = typer.Typer(help="Run the external-ai MCP bridge service.")
@@ -47,6 +47,7 @@ def websocket(
         raise typer.Exit(1) from exc
 
     try:
+        install_uvloop()
         asyncio.run(run_websocket(settings, host=host, port=port))
     except AIWebhookError as exc:
         typer.secho(f"AI webhook error: {exc}", fg=typer.colors.RED)
@@ -69,6 +70,7 @@ def memory_websocket(
         raise typer.Exit(1) from exc
 
     try:
+        install_uvloop()
         asyncio.run(run_memory_websocket(settings, host=host, port=port))
     except KeyboardInterrupt:
         typer.secho("Shutting down (memory websocket).", fg=typer.colors.YELLOW)
@@ -30,6 +30,19 @@ def _parse_bool(value: str | None, *, default: bool = False) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _parse_int(values: dict[str, str], key: str, default: int, *, minimum: int = 1) -> int:
+    raw = values.get(key)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        parsed = int(raw)
+    except ValueError as exc:
+        raise SettingsError(f"{key} must be an integer.") from exc
+    if parsed < minimum:
+        raise SettingsError(f"{key} must be at least {minimum}.")
+    return parsed
+
+
 class Settings(BaseModel):
     """Application configuration loaded from environment variables or a dotenv file."""
 
@@ -38,10 +51,19 @@ class Settings(BaseModel):
     ai_timeout: float = Field(default=30.0, gt=0)
     extra_webhooks: dict[str, WebhookTarget] = Field(default_factory=dict)
     frontend_webhook_url: HttpUrl | None = None
+    frontend_webhook_workers: int = Field(default=4, gt=0)
+    frontend_webhook_queue_size: int = Field(default=10_000, gt=0)
+    frontend_webhook_timeout: float = Field(default=10.0, gt=0)
+    frontend_webhook_drain_timeout: float = Field(default=10.0, ge=0)
+    redis_url: str | None = None
+    mcp_max_batch_size: int = Field(default=50, gt=0)
+    mcp_max_concurrent_rpc: int = Field(default=32, gt=0)
     model_name: str = Field(default="external-ai")
     conversation_db_path: Path = Field(default=Path("conversation_history.db"))
     conversation_history_limit: int = Field(default=20, gt=0, le=200)
     message_retention_days: int = Field(default=14, ge=1)
+    session_cache_ttl: float = Field(default=5.0, ge=0)
+    callback_history_size: int = Field(default=1024, gt=0)
     bearer_auth_enabled: bool = Field(default=False)
     default_bearer_token: str | None = None
     route_bearer_tokens: dict[str, str] = Field(default_factory=dict)
@@ -125,6 +147,26 @@ class Settings(BaseModel):
         if retention_days < 1:
             raise SettingsError("MESSAGE_RETENTION_DAYS must be at least 1.")
 
+        frontend_timeout_raw = values.get("FRONTEND_WEBHOOK_TIMEOUT", "10")
+        try:
+            frontend_timeout = float(frontend_timeout_raw)
+        except ValueError as exc:
+            raise SettingsError("FRONTEND_WEBHOOK_TIMEOUT must be numeric.") from exc
+
+        drain_timeout_raw = values.get("FRONTEND_WEBHOOK_DRAIN_TIMEOUT", "10")
+        try:
+            drain_timeout = float(drain_timeout_raw)
+        except ValueError as exc:
+            raise SettingsError("FRONTEND_WEBHOOK_DRAIN_TIMEOUT must be numeric.") from exc
+
+        cache_ttl_raw = values.get("SESSION_CACHE_TTL", "5")
+        try:
+            session_cache_ttl = float(cache_ttl_raw)
+        except ValueError as exc:
+            raise SettingsError("SESSION_CACHE_TTL must be numeric.") from exc
+        if session_cache_ttl < 0:
+            raise SettingsError("SESSION_CACHE_TTL cannot be negative.")
+
         try:
             return cls(
                 ai_webhook_url=webhook_url,
@@ -132,10 +174,19 @@ class Settings(BaseModel):
                 ai_timeout=timeout,
                 extra_webhooks=extra_webhooks,
                 frontend_webhook_url=values.get("FRONTEND_WEBHOOK_URL"),
+                frontend_webhook_workers=_parse_int(values, "FRONTEND_WEBHOOK_WORKERS", 4),
+                frontend_webhook_queue_size=_parse_int(values, "FRONTEND_WEBHOOK_QUEUE_SIZE", 10_000),
+                frontend_webhook_timeout=frontend_timeout,
+                frontend_webhook_drain_timeout=drain_timeout,
+                redis_url=values.get("REDIS_URL") or None,
+                mcp_max_batch_size=_parse_int(values, "MCP_MAX_BATCH_SIZE", 50),
+                mcp_max_concurrent_rpc=_parse_int(values, "MCP_MAX_CONCURRENT_RPC", 32),
                 model_name=values.get("MODEL_NAME", "external-ai"),
                 conversation_db_path=db_path,
                 conversation_history_limit=history_limit,
                 message_retention_days=retention_days,
+                session_cache_ttl=session_cache_ttl,
+                callback_history_size=_parse_int(values, "CALLBACK_HISTORY_SIZE", 1024),
                 bearer_auth_enabled=_parse_bool(values.get("ENABLE_BEARER_AUTH")),
                 default_bearer_token=values.get("API_BEARER_TOKEN"),
                 route_bearer_tokens=route_tokens,
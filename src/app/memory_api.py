@@ -2,16 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 from typing import Any, Awaitable, Callable, Mapping
 
+import orjson
 from mcp.server.fastmcp import FastMCP
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import Response
 from starlette.routing import Route
 
 from .config import Settings
+from .responses import ORJSONResponse, read_json, request_base_url
 from .storage import ConversationMessage, ConversationStore, format_history_for_prompt
 
 logger = logging.getLogger(__name__)
@@ -71,15 +74,30 @@ class MemoryService:
     def list_sessions(self, limit: int | None = None) -> list[dict[str, Any]]:
         return self.store.list_sessions(limit=limit or 100)
 
-    def _fetch_messages(self, session_id: str, limit: int | None = None) -> list[ConversationMessage]:
+    def _fetch_messages(
+        self,
+        session_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> list[ConversationMessage]:
         limit_value = self._normalize_limit(limit) if limit is not None else None
-        return self.store.get_messages(session_id, limit=limit_value)
+        return self.store.get_messages(session_id, limit=limit_value, cursor=cursor)
 
-    def conversation_detail(self, session_id: str, limit: int | None = None) -> dict[str, Any]:
-        messages = self._fetch_messages(session_id, limit=limit)
-        if not messages:
+    def conversation_detail(
+        self,
+        session_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        messages = self._fetch_messages(session_id, limit=limit, cursor=cursor)
+        # An empty page past the first one just means the history is exhausted.
+        if not messages and cursor is None:
             raise SessionNotFoundError(session_id)
-        return {"session_id": session_id, "messages": _serialize_messages(messages)}
+        payload: dict[str, Any] = {"session_id": session_id, "messages": _serialize_messages(messages)}
+        if limit is not None and messages:
+            # Feed this back as ``cursor`` to fetch the messages before this page.
+            payload["next_cursor"] = messages[0].cursor
+        return payload
 
     def recall_memory(self, session_id: str, limit: int | str | None = None) -> dict[str, Any]:
         limit_value = self._normalize_limit(limit)
@@ -163,6 +181,27 @@ class MemoryService:
             "payload": payload_dict,
         }
 
+    # Async variants run the blocking SQLite work in a worker thread so the event loop keeps serving.
+    async def alist_sessions(self, limit: int | None = None) -> list[dict[str, Any]]:
+        return await asyncio.to_thread(self.list_sessions, limit)
+
+    async def aconversation_detail(
+        self,
+        session_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        return await asyncio.to_thread(self.conversation_detail, session_id, limit, cursor)
+
+    async def arecall_memory(self, session_id: str, limit: int | str | None = None) -> dict[str, Any]:
+        return await asyncio.to_thread(self.recall_memory, session_id, limit)
+
+    async def adelete_session(self, session_id: str) -> None:
+        await asyncio.to_thread(self.delete_session, session_id)
+
+    async def arecord_ai_response(self, **kwargs: Any) -> dict[str, Any]:
+        return await asyncio.to_thread(self.record_ai_response, **kwargs)
+
 
 ResponseHook = Callable[[dict[str, Any]], Awaitable[None]]
 
@@ -177,33 +216,36 @@ def register_memory_mcp_surface(
     """Attach memory tools/resources to an existing MCP server."""
     service = MemoryService(store, settings)
 
-    async def _dispatch_response(record: dict[str, Any]) -> None:
-        if response_handler is None:
-            return
+    async def _dispatch_response(handler: ResponseHook, record: dict[str, Any]) -> None:
         try:
-            await response_handler(record)
+            await handler(record)
         except Exception as exc:  # pragma: no cover - defensive
             logger.warning("Response handler failed: %s", exc)
 
     @mcp.resource("memory://sessions")
-    def sessions_resource() -> str:
-        return json.dumps({"sessions": service.list_sessions()}, indent=2)
+    async def sessions_resource() -> str:
+        return orjson.dumps({"sessions": await service.alist_sessions()}).decode()
+
+    health_json = orjson.dumps({"status": "ok", "conversation_limit": settings.conversation_history_limit}).decode()
 
     @mcp.resource("memory://health")
     def health_resource() -> str:
-        status = {"status": "ok", "conversation_limit": settings.conversation_history_limit}
-        return json.dumps(status, indent=2)
+        return health_json
 
     @mcp.tool()
     async def list_conversations(limit: int | None = None) -> dict[str, Any]:
         """Return the most recently updated sessions stored in the memory DB."""
-        return {"sessions": service.list_sessions(limit=limit or 100)}
+        return {"sessions": await service.alist_sessions(limit=limit or 100)}
 
     @mcp.tool()
-    async def get_conversation(session_id: str, limit: int | None = None) -> dict[str, Any]:
-        """Dump role/content/metadata for a session."""
+    async def get_conversation(
+        session_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """Dump role/content/metadata for a session; pass ``next_cursor`` back as ``cursor`` to page."""
         try:
-            return service.conversation_detail(session_id, limit=limit)
+            return await service.aconversation_detail(session_id, limit=limit, cursor=cursor)
         except SessionNotFoundError as exc:  # pragma: no cover - surfaced to MCP clients
             raise ValueError(f"Session '{session_id}' not found.") from exc
 
@@ -212,12 +254,12 @@ def register_memory_mcp_surface(
         """
         Return a context block plus separated user/assistant turns for a session.
         """
-        return service.recall_memory(session_id, limit=limit)
+        return await service.arecall_memory(session_id, limit=limit)
 
     @mcp.tool()
     async def delete_conversation(session_id: str) -> dict[str, Any]:
         """Remove a stored session and all of its messages."""
-        service.delete_session(session_id)
+        await service.adelete_session(session_id)
         return {"status": "deleted", "session_id": session_id}
 
     @mcp.tool()
@@ -237,14 +279,16 @@ def register_memory_mcp_surface(
         fall back to payload["message"] or serialize the payload for storage.
         """
 
-        record = service.record_ai_response(
+        record = await service.arecord_ai_response(
             session_id=session_id,
             message=message,
             payload=payload,
             role=role or "user",
             status=status,
         )
-        await _dispatch_response(record)
+        # Standalone memory servers have no listeners, so skip the dispatch entirely.
+        if response_handler is not None:
+            await _dispatch_response(response_handler, record)
         return record
 
 
@@ -270,7 +314,10 @@ def build_memory_server(
 
 async def run_memory_stdio(settings: Settings) -> None:
     """Run the conversation memory MCP server over stdio."""
-    store = ConversationStore(settings.conversation_db_path)
+    # Imported here because server_components imports this module.
+    from .server_components.state import get_store
+
+    store = get_store(settings.conversation_db_path, settings.session_cache_ttl)
     server = build_memory_server(store, settings)
     await server.run_stdio_async()
 
@@ -320,29 +367,40 @@ def _coerce_session_value(value: Any) -> str | None:
     return str(value)
 
 
-def build_memory_routes(store: ConversationStore, settings: Settings) -> list[Route]:
+def build_memory_routes(
+    store: ConversationStore,
+    settings: Settings,
+    *,
+    service: MemoryService | None = None,
+) -> list[Route]:
     """Create Starlette routes that expose conversation history helpers."""
-    service = MemoryService(store, settings)
+    service = service or MemoryService(store, settings)
 
     async def list_conversations(request: Request) -> Response:
         try:
             limit = int(request.query_params.get("limit", "100"))
         except ValueError:
             limit = 100
-        sessions = service.list_sessions(limit=limit)
-        return JSONResponse({"sessions": sessions})
+        sessions = await service.alist_sessions(limit=limit)
+        return ORJSONResponse({"sessions": sessions})
 
     async def conversation_detail_handler(request: Request) -> Response:
         session_id = request.path_params["session_id"]
         if request.method == "DELETE":
-            service.delete_session(session_id)
-            return JSONResponse({"status": "deleted", "session_id": session_id})
+            await service.adelete_session(session_id)
+            return ORJSONResponse({"status": "deleted", "session_id": session_id})
 
         try:
-            payload = service.conversation_detail(session_id)
+            payload = await service.aconversation_detail(
+                session_id,
+                limit=request.query_params.get("limit"),
+                cursor=request.query_params.get("cursor"),
+            )
         except SessionNotFoundError:
-            return JSONResponse({"error": "Session not found"}, status_code=404)
-        return JSONResponse(payload)
+            return ORJSONResponse({"error": "Session not found"}, status_code=404)
+        except ValueError as exc:
+            return ORJSONResponse({"error": str(exc)}, status_code=400)
+        return ORJSONResponse(payload)
 
     async def recall_memory_handler(request: Request) -> Response:
         payload: dict[str, Any] = {}
@@ -355,7 +413,7 @@ def build_memory_routes(store: ConversationStore, settings: Settings) -> list[Ro
             limit_raw = params.get("limit") or params.get("history_limit")
         else:
             try:
-                payload = await request.json()
+                payload = await read_json(request)
                 if not isinstance(payload, dict):
                     logger.warning("Memory recall received non-dict JSON body: %s", payload)
                     payload = {}
@@ -377,8 +435,8 @@ def build_memory_routes(store: ConversationStore, settings: Settings) -> list[Ro
 
         if not session_id:
             logger.info("Memory recall probe without session id. Returning healthy status.")
-            base_url = str(request.base_url).rstrip("/")
-            return JSONResponse(
+            base_url = request_base_url(request)
+            return ORJSONResponse(
                 {
                     "status": "healthy",
                     "requires_session_id": True,
@@ -391,14 +449,14 @@ def build_memory_routes(store: ConversationStore, settings: Settings) -> list[Ro
                 }
             )
 
-        payload = service.recall_memory(session_id, limit_raw or settings.conversation_history_limit)
+        payload = await service.arecall_memory(session_id, limit_raw or settings.conversation_history_limit)
         logger.info(
             "Memory recall served session=%s message_count=%s limit=%s",
             session_id,
             payload["message_count"],
             payload["limit_applied"],
         )
-        return JSONResponse(payload)
+        return ORJSONResponse(payload)
 
     return [
         Route("/conversations", list_conversations, methods=["GET"]),
@@ -0,0 +1,48 @@
+"""orjson-backed JSON request parsing and response classes shared by the Starlette apps."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse that renders with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        # Non-string keys are stringified, matching what JSONResponse accepted.
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# (scheme, Host header, server, root_path) -> base URL; reset when full, since the Host header is client-supplied.
+_BASE_URLS: dict[tuple[Any, ...], str] = {}
+_BASE_URLS_MAX_ENTRIES = 32
+
+
+def request_base_url(request: Request) -> str:
+    """Return ``request.base_url`` without its trailing slash, memoized on the scope fields it derives from."""
+    scope = request.scope
+    server = scope.get("server")
+    key = (
+        scope.get("scheme"),
+        request.headers.get("host"),
+        tuple(server) if server else None,
+        scope.get("root_path", ""),
+    )
+    base_url = _BASE_URLS.get(key)
+    if base_url is None:
+        if len(_BASE_URLS) >= _BASE_URLS_MAX_ENTRIES:
+            _BASE_URLS.clear()
+        base_url = _BASE_URLS[key] = str(request.base_url).rstrip("/")
+    return base_url
+
+
+async def read_json(request: Request) -> Any:
+    """Parse the request body with orjson; raises ``orjson.JSONDecodeError`` (a ValueError) on bad input."""
+    return orjson.loads(await request.body())
+
+
+__all__ = ["ORJSONResponse", "read_json", "request_base_url"]
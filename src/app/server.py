@@ -1,7 +1,9 @@
 """MCP server wiring."""
 from __future__ import annotations
 
+import asyncio
 import logging
+from typing import Any
 
 import uvicorn
 
@@ -9,6 +11,8 @@ from .ai_client import AIWebhookClient
 from .config import Settings
 from .server_components.apps import _build_memory_websocket_app, _build_websocket_app
 from .server_components.mcp import build_server, run_stdio
+from .server_components.relay import build_response_relay
+from .server_components.response_handler import build_frontend_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +23,45 @@ __all__ = [
     "_build_memory_websocket_app",
     "run_websocket",
     "run_memory_websocket",
+    "install_uvloop",
 ]
 
 
+def install_uvloop() -> bool:
+    """Use uvloop for event loops created from here on, if it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def _build_uvicorn_config(app: Any, settings: Settings, host: str, port: int) -> uvicorn.Config:
+    """Uvicorn config shared by the WebSocket runners.
+
+    Pending chat responses live in process memory. Without ``REDIS_URL`` a callback must
+    reach the process that is waiting for it, so run a single worker; with ``REDIS_URL`` set
+    the relay forwards replies between processes, so multiple workers or replicas are safe.
+    """
+    log_level = getattr(settings, "log_level", "INFO").lower()
+    return uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        log_level=log_level,
+        # "auto" selects uvloop and httptools when the uvicorn[standard] extras are installed.
+        # The loop choice only applies when uvicorn creates the loop (e.g. the Docker CMD);
+        # the CLI runners start their own loop and call install_uvloop() first.
+        loop="auto",
+        http="auto",
+        backlog=2048,
+        timeout_keep_alive=75,
+        # Request handlers already log what matters; per-request access lines are pure overhead.
+        access_log=False,
+    )
+
+
 async def run_websocket(
     settings: Settings,
     host: str = "0.0.0.0",
@@ -29,11 +69,13 @@ async def run_websocket(
     client: AIWebhookClient | None = None,
 ) -> None:
     """Run the combined MCP + OpenAI-compatible server over WebSocket."""
-    server = build_server(settings, client=client)
-    app = _build_websocket_app(server, settings, client=client)
+    # The FastMCP tools and the HTTP routes share one dispatcher and relay; the app lifespan closes them.
+    dispatcher = build_frontend_dispatcher(settings)
+    relay = build_response_relay(settings)
+    server = build_server(settings, client=client, dispatcher=dispatcher, relay=relay)
+    app = _build_websocket_app(server, settings, client=client, dispatcher=dispatcher, relay=relay)
 
-    log_level = getattr(settings, "log_level", "INFO").lower()
-    config = uvicorn.Config(app, host=host, port=port, log_level=log_level)
+    config = _build_uvicorn_config(app, settings, host, port)
     uvicorn_server = uvicorn.Server(config)
     await uvicorn_server.serve()
 
@@ -42,7 +84,6 @@ async def run_memory_websocket(settings: Settings, host: str = "0.0.0.0", port:
     """Run only the memory MCP surface over WebSocket."""
     app = _build_memory_websocket_app(settings)
 
-    log_level = getattr(settings, "log_level", "INFO").lower()
-    config = uvicorn.Config(app, host=host, port=port, log_level=log_level)
+    config = _build_uvicorn_config(app, settings, host, port)
     uvicorn_server = uvicorn.Server(config)
     await uvicorn_server.serve()
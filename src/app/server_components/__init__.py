@@ -3,17 +3,29 @@
 from .apps import _build_memory_websocket_app, _build_websocket_app
 from .middleware import build_auth_middleware, build_middleware
 from .mcp import build_server, run_stdio
-from .response_handler import build_response_handler
-from .state import callback_messages, pending_responses
+from .relay import RedisResponseRelay, RelaySubscription, build_response_relay
+from .response_handler import FrontendWebhookDispatcher, build_frontend_dispatcher, build_response_handler
+from .state import STREAM_END, add_callback_message, callback_messages, callback_messages_json, deliver_pending, get_store, pending_responses, set_callback_history_size
 
 __all__ = [
+    "STREAM_END",
+    "FrontendWebhookDispatcher",
+    "RedisResponseRelay",
+    "RelaySubscription",
     "_build_memory_websocket_app",
+    "add_callback_message",
     "_build_websocket_app",
     "build_auth_middleware",
+    "build_frontend_dispatcher",
     "build_middleware",
     "build_server",
     "build_response_handler",
+    "build_response_relay",
     "callback_messages",
+    "callback_messages_json",
+    "deliver_pending",
+    "get_store",
     "pending_responses",
     "run_stdio",
+    "set_callback_history_size",
 ]
@@ -1,48 +1,693 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
 import logging
+import secrets
 import time
-import uuid
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
 
+import orjson
 from mcp.server.fastmcp import FastMCP
 from mcp.server.websocket import websocket_server
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
 from starlette.routing import Route, WebSocketRoute
+from starlette.types import Receive, Scope, Send
 from starlette.websockets import WebSocket
 
 from ..ai_client import AIWebhookClient
 from ..config import Settings
-from ..memory_api import MemoryService, build_memory_routes, build_memory_server
+from ..memory_api import (
+    MemoryService,
+    ResponseHook,
+    build_memory_routes,
+    build_memory_server,
+)
+from ..responses import ORJSONResponse, read_json, request_base_url
 from ..storage import ConversationStore, format_history_for_prompt
 from ..swagger import openapi_json_handler, swagger_ui_handler
 from .middleware import build_middleware
-from .response_handler import build_response_handler
-from .state import pending_responses
+from .relay import RedisResponseRelay, RelaySubscription, build_response_relay
+from .response_handler import (
+    FrontendWebhookDispatcher,
+    build_frontend_dispatcher,
+    build_response_handler,
+)
+from .state import STREAM_END, get_store, pending_responses
 
 logger = logging.getLogger(__name__)
 
-def _build_websocket_app(server: FastMCP, settings: Settings, client: AIWebhookClient | None = None) -> Starlette:
-    store = ConversationStore(settings.conversation_db_path)
-    response_handler = build_response_handler(settings)
-    
-    # Clean up old messages on startup
+# Appended to every chat prompt; only the session id varies per request.
+_NOTICE_TEMPLATE = (
+    "You are a memory coordination assistant for the NinjaCat service.\n\n"
+    "**Instructions:**\n"
+    "1. Use the available MCP tools listed below to process the user's request.\n"
+    "2. Recall the full context of the current conversation using the `recall_conversation_context` tool and the provided session ID.\n"
+    "3. Even if no relevant information is found, you MUST respond using `send_user_response`.\n"
+    "4. `send_user_response` is the ONLY valid way to reply to the user and OpenWebUI.\n\n"
+    "**Available MCP tools:** list_conversations, get_conversation, recall_conversation_context, send_user_response\n"
+    "**Session ID:** %s\n"
+)
+
+# Shared JSON Schema type unions; tuples serialize as arrays and cannot be mutated in place.
+_NULLABLE_STRING = ("string", "null")
+_NULLABLE_INTEGER = ("integer", "null")
+_NULLABLE_OBJECT = ("object", "null")
+
+# Static JSON-RPC discovery payloads for the memory tools; identical for every request.
+_MEMORY_TOOLS = [
+    {
+        "name": "list_conversations",
+        "description": "Return the most recently updated sessions stored in the memory DB.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": {"type": _NULLABLE_INTEGER, "description": "Maximum number of sessions to return"}
+            }
+        }
+    },
+    {
+        "name": "get_conversation",
+        "description": "Dump role/content/metadata for a session.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "session_id": {"type": "string", "description": "Session ID to retrieve"},
+                "limit": {"type": _NULLABLE_INTEGER, "description": "Maximum number of messages to return"},
+                "cursor": {"type": _NULLABLE_STRING, "description": "next_cursor from a previous page"}
+            },
+            "required": ["session_id"]
+        }
+    },
+    {
+        "name": "recall_conversation_context",
+        "description": "Return a context block plus separated user/assistant turns for a session.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "session_id": {"type": "string", "description": "Session ID to recall"},
+                "limit": {"type": _NULLABLE_INTEGER, "description": "Maximum number of messages to include"}
+            },
+            "required": ["session_id"]
+        }
+    },
+    {
+        "name": "delete_conversation",
+        "description": "Remove a stored session and all of its messages.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "session_id": {"type": "string", "description": "Session ID to delete"}
+            },
+            "required": ["session_id"]
+        }
+    },
+    {
+        "name": "send_user_response",
+        "description": "Send the AI response back to the user and OpenWebUI. MUST be called with your response message after receiving a prompt. This records the response in conversation memory and sends it to the client.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "session_id": {"type": _NULLABLE_STRING, "description": "Session ID to record response in"},
+                "message": {"type": _NULLABLE_STRING, "description": "The response message content from the AI"},
+                "payload": {"type": _NULLABLE_OBJECT, "description": "Additional payload data"},
+                "role": {"type": _NULLABLE_STRING, "description": "Role of the message sender (defaults to 'user')"},
+                "status": {"type": _NULLABLE_STRING, "description": "Status of the response"}
+            },
+            "required": ["message"]
+        }
+    }
+]
+
+_MEMORY_RESOURCES = [
+    {
+        "uri": "memory://sessions",
+        "name": "Conversation Sessions",
+        "description": "List of all conversation sessions",
+        "mimeType": "application/json"
+    },
+    {
+        "uri": "memory://health",
+        "name": "Memory Service Health",
+        "description": "Health status of the memory service",
+        "mimeType": "application/json"
+    }
+]
+
+_TOOLS_LIST_RESULT = {"tools": _MEMORY_TOOLS}
+_RESOURCES_LIST_RESULT = {"resources": _MEMORY_RESOURCES}
+
+_SERVER_INFO = {"name": "conversation-memory", "version": "0.1.0"}
+# initialize results for apps that serve resources/* and for the tools-only memory app.
+_INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {"tools": {"listChanged": True}, "resources": {"listChanged": True}},
+    "serverInfo": _SERVER_INFO,
+}
+_TOOLS_ONLY_INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {"tools": {"listChanged": True}},
+    "serverInfo": _SERVER_INFO,
+}
+
+# Serialized forms of the constant results above, spliced into replies for single requests.
+_TOOLS_LIST_RESULT_BYTES = orjson.dumps(_TOOLS_LIST_RESULT)
+_RESOURCES_LIST_RESULT_BYTES = orjson.dumps(_RESOURCES_LIST_RESULT)
+_INITIALIZE_RESULT_BYTES = orjson.dumps(_INITIALIZE_RESULT)
+_TOOLS_ONLY_INITIALIZE_RESULT_BYTES = orjson.dumps(_TOOLS_ONLY_INITIALIZE_RESULT)
+
+
+async def _call_list_conversations(service: MemoryService, args: dict[str, Any], _: ResponseHook) -> dict[str, Any]:
+    return {"sessions": await service.alist_sessions(limit=args.get("limit"))}
+
+
+async def _call_get_conversation(service: MemoryService, args: dict[str, Any], _: ResponseHook) -> dict[str, Any]:
+    return await service.aconversation_detail(args["session_id"], args.get("limit"), args.get("cursor"))
+
+
+async def _call_recall_conversation_context(
+    service: MemoryService, args: dict[str, Any], _: ResponseHook
+) -> dict[str, Any]:
+    return await service.arecall_memory(args["session_id"], args.get("limit"))
+
+
+async def _call_delete_conversation(service: MemoryService, args: dict[str, Any], _: ResponseHook) -> dict[str, Any]:
+    session_id = args["session_id"]
+    await service.adelete_session(session_id)
+    return {"status": "deleted", "session_id": session_id}
+
+
+async def _call_send_user_response(
+    service: MemoryService, args: dict[str, Any], response_handler: ResponseHook
+) -> dict[str, Any]:
+    session_id = args.get("session_id")
+    message = args.get("message")
+    role = args.get("role") or "user"
+    status = args.get("status")
+    logger.info("📨 AI called send_user_response tool: session_id=%s, role=%s, status=%s", session_id, role, status)
+    result = await service.arecord_ai_response(
+        session_id=session_id,
+        message=message,
+        payload=args.get("payload"),
+        role=role,
+        status=status,
+    )
+    logger.debug("Recorded AI response via tool: %s", result)
+    # Dispatch the response to OpenWebUI
+    await response_handler(result)
+    logger.info("✅ AI response recorded and dispatched for session %s", result["session_id"])
+    return result
+
+
+# JSON-RPC tools/call handlers keyed by tool name.
+_TOOL_DISPATCH: dict[str, Callable[[MemoryService, dict[str, Any], ResponseHook], Awaitable[dict[str, Any]]]] = {
+    "list_conversations": _call_list_conversations,
+    "get_conversation": _call_get_conversation,
+    "recall_conversation_context": _call_recall_conversation_context,
+    "delete_conversation": _call_delete_conversation,
+    "send_user_response": _call_send_user_response,
+}
+
+_CHAT_SESSION_KEYS = (
+    "session_id",
+    "sessionID",
+    "sessionId",
+    "conversation_id",
+    "conversationID",
+    "conversationId",
+)
+
+
+def _chat_session_id(payload: dict[str, Any]) -> str | None:
+    """Find a caller-provided session identifier, recursing into common wrappers."""
+    for key in _CHAT_SESSION_KEYS:
+        value = payload.get(key)
+        if isinstance(value, str) and value:
+            return value
+
+    for nested_key in ("body", "payload", "data"):
+        nested = payload.get(nested_key)
+        if isinstance(nested, dict):
+            nested_value = _chat_session_id(nested)
+            if nested_value:
+                return nested_value
+    return None
+
+
+# Seconds to wait for the backend to call back with a chat response.
+CHAT_RESPONSE_TIMEOUT = 4120.0
+# Seconds between retention sweeps; the first sweep runs as soon as the app starts.
+MESSAGE_CLEANUP_INTERVAL = 3600.0
+
+
+def _sse_event(payload: dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+def _chat_chunk(session_id: str, model: str, delta: dict[str, Any], finish_reason: str | None = None) -> dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{session_id}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+async def _release_chat_waiter(session_id: str, waiter: Any, listener: RelaySubscription | None) -> None:
+    """Stop waiting for a session's reply; safe to call more than once."""
+    # A later request for the same session may have registered its own waiter by now.
+    if waiter is not None and pending_responses.get(session_id) is waiter:
+        del pending_responses[session_id]
+    if listener is not None:
+        await listener.aclose()
+
+
+class _ChatStreamResponse(StreamingResponse):
+    """SSE chat reply that releases the session's waiter however the response ends.
+
+    Starlette can fail before the body iterator starts (e.g. sending the headers to a client
+    that already left), and then the generator's own ``finally`` never runs.
+    """
+
+    def __init__(
+        self,
+        content: AsyncIterator[bytes],
+        *,
+        session_id: str,
+        waiter: asyncio.Queue,
+        listener: RelaySubscription | None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(content, **kwargs)
+        self._session_id = session_id
+        self._waiter = waiter
+        self._listener = listener
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await _release_chat_waiter(self._session_id, self._waiter, self._listener)
+
+
+async def _stream_chat_completion(
+    queue: asyncio.Queue,
+    session_id: str,
+    model: str,
+    listener: RelaySubscription | None = None,
+) -> AsyncIterator[bytes]:
+    """Relay backend payloads for a session as OpenAI chat.completion.chunk SSE events."""
+    try:
+        yield _sse_event(_chat_chunk(session_id, model, {"role": "assistant"}))
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=CHAT_RESPONSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.error("Timeout waiting for streamed callback from backend")
+                yield _sse_event(
+                    {"error": {"message": "Backend did not respond within timeout period. Please try again.", "type": "timeout"}}
+                )
+                break
+            if item is STREAM_END:
+                yield _sse_event(_chat_chunk(session_id, model, {}, "stop"))
+                break
+            content = item.get("message", "")
+            if content:
+                yield _sse_event(_chat_chunk(session_id, model, {"content": content}))
+        yield b"data: [DONE]\n\n"
+    finally:
+        # Covers a stream cancelled midway; _ChatStreamResponse covers one that never started.
+        await _release_chat_waiter(session_id, queue, listener)
+
+
+# Routes reachable without a bearer token when auth is enabled.
+_AUTH_EXEMPT_PATHS = frozenset({"/healthz", "/docs", "/openapi.json"})
+
+# JSON-RPC error objects are shared across replies; they are only ever serialized, never mutated.
+_ERR_PARSE = {"code": -32700, "message": "Parse error"}
+_ERR_INVALID_REQUEST = {"code": -32600, "message": "Invalid Request"}
+_ERR_METHOD_NOT_FOUND = {"code": -32601, "message": "Method not found"}
+_ERR_INVALID_PARAMS = {"code": -32602, "message": "Invalid params"}
+
+
+def _constant_reply(
+    request_id: Any, result: dict[str, Any], result_bytes: bytes, batched: bool
+) -> tuple[dict[str, Any] | Response, int]:
+    """Reply with a constant result, reusing its pre-serialized bytes outside of batches."""
+    if batched:
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}, 200
+    body = b'{"jsonrpc":"2.0","id":' + orjson.dumps(request_id) + b',"result":' + result_bytes + b"}"
+    return Response(body, media_type="application/json"), 200
+
+
+def _jsonrpc_error(request_id: Any, error: dict[str, Any], status_code: int) -> tuple[dict[str, Any], int]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}, status_code
+
+
+# Dispatchers receive ``batched=True`` for batch members, which must come back as dicts;
+# single requests may return a ready-made Response (e.g. a pre-serialized constant reply).
+JsonRpcDispatch = Callable[..., Awaitable[tuple[dict[str, Any] | Response | None, int]]]
+
+
+async def _handle_jsonrpc_http(request: Request, dispatch: JsonRpcDispatch, max_batch_size: int) -> Response:
+    """Parse a JSON-RPC POST body and dispatch a single message or a batch.
+
+    Batch members run concurrently and are answered with one array; notifications
+    produce no entry, and a batch made only of notifications returns 204.
+    """
+    if request.method != "POST":
+        return ORJSONResponse({"error": "Method not allowed"}, status_code=405)
+
     try:
-        deleted_count = store.delete_old_messages(settings.message_retention_days)
-        if deleted_count > 0:
-            logger.info("Cleaned up %d old messages (older than %d days)", deleted_count, settings.message_retention_days)
+        data = await read_json(request)
     except Exception as exc:
-        logger.warning("Failed to clean up old messages: %s", exc)
+        logger.error("MCP HTTP error: %s", exc)
+        body, status_code = _jsonrpc_error(None, _ERR_PARSE, 400)
+        return ORJSONResponse(body, status_code=status_code)
+
+    if isinstance(data, list):
+        if not data:
+            body, status_code = _jsonrpc_error(None, _ERR_INVALID_REQUEST, 400)
+            return ORJSONResponse(body, status_code=status_code)
+        if len(data) > max_batch_size:
+            error = {"code": -32600, "message": f"Batch exceeds {max_batch_size} requests"}
+            body, status_code = _jsonrpc_error(None, error, 400)
+            return ORJSONResponse(body, status_code=status_code)
+        results = await asyncio.gather(*(dispatch(item, batched=True) for item in data))
+        replies = [body for body, _ in results if body is not None]
+        if not replies:
+            return Response(status_code=204)
+        return ORJSONResponse(replies)
+
+    body, status_code = await dispatch(data)
+    if body is None:
+        return Response(status_code=status_code)
+    if isinstance(body, Response):
+        return body
+    return ORJSONResponse(body, status_code=status_code)
+
+
+_HEALTH_BODY = b'{"status":"ok"}'
+
+
+async def _health(_: Request) -> Response:
+    return Response(_HEALTH_BODY, media_type="application/json")
+
+
+# Stands in for the request's base URL in the pre-rendered OpenAPI documents below.
+_BASE_URL_PLACEHOLDER = "__BASE_URL__"
+
+
+def _render_mcp_openapi(base_url: str) -> bytes:
+    """Serialize the OpenAPI description of the bridge."""
+    schema = {
+        "openapi": "3.0.3",
+        "info": {
+            "title": "external-ai MCP Bridge",
+            "version": "0.1.0",
+            "description": (
+                "Minimal OpenAPI description exposing health checks for the external-ai MCP bridge. "
+                "The actual MCP interaction occurs over the WebSocket endpoint documented in the "
+                "x-mcp extension."
+            ),
+        },
+        "servers": [{"url": base_url}],
+        "paths": {
+            "/healthz": {
+                "get": {
+                    "summary": "Service health check",
+                    "responses": {
+                        "200": {
+                            "description": "Service healthy",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "type": "object",
+                                        "properties": {
+                                            "status": {"type": "string"},
+                                        },
+                                    }
+                                }
+                            },
+                        }
+                    },
+                }
+            }
+        },
+        "components": {},
+        "x-mcp": {
+            "transport": "websocket",
+            "endpoint": f"{base_url}/mcp/openai",
+            "notes": "Clients should open a WebSocket connection using the MCP subprotocol."
+        },
+    }
+    return orjson.dumps(schema)
+
+
+def _render_chat_openapi(base_url: str) -> bytes:
+    """Serialize the OpenAPI description of the chat completions endpoint."""
+    schema = {
+        "openapi": "3.0.3",
+        "info": {
+            "title": "external-ai Chat Completions",
+            "version": "1.0.0",
+            "description": "OpenAI-compatible chat completions API"
+        },
+        "servers": [{"url": base_url}],
+        "paths": {
+            "/v1/chat/completions": {
+                "post": {
+                    "summary": "Create chat completion",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "messages": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "role": {"type": "string"},
+                                                    "content": {"type": "string"}
+                                                }
+                                            }
+                                        },
+                                        "stream": {"type": "boolean"}
+                                    }
+                                }
+                            }
+                        },
+                        "responses": {
+                            "200": {
+                                "description": "Successful response",
+                                "content": {
+                                    "application/json": {
+                                        "schema": {"type": "object"}
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    return orjson.dumps(schema)
+
+
+_MCP_OPENAPI_TEMPLATE = _render_mcp_openapi(_BASE_URL_PLACEHOLDER)
+_CHAT_OPENAPI_TEMPLATE = _render_chat_openapi(_BASE_URL_PLACEHOLDER)
+
+
+def _openapi_body(template: bytes, request: Request) -> bytes:
+    """Fill a pre-rendered OpenAPI document with the request's base URL."""
+    # Encode as a JSON string and drop the quotes so the URL is escaped like any other value.
+    return template.replace(_BASE_URL_PLACEHOLDER.encode(), orjson.dumps(request_base_url(request))[1:-1])
+
+
+async def _dispatch_jsonrpc(
+    data: Any,
+    *,
+    service: MemoryService,
+    response_handler: ResponseHook,
+    settings: Settings,
+    limiter: asyncio.Semaphore,
+    resources: bool,
+    batched: bool = False,
+) -> tuple[dict[str, Any] | Response | None, int]:
+    """Handle a single JSON-RPC message for memory tools.
+
+    ``resources`` controls whether the resources/* methods are served and advertised.
+    """
+    if not isinstance(data, dict):
+        # The body parsed, so a non-object message is an invalid request rather than a parse error.
+        return _jsonrpc_error(None, _ERR_INVALID_REQUEST, 400)
+
+    method = data.get("method")
+    id = data.get("id")
+
+    # Handle notifications (no id)
+    if id is None:
+        logger.info("Received MCP notification: %s", method)
+        return None, 204
+
+    if not method:
+        return _jsonrpc_error(id, _ERR_PARSE, 400)
+
+    logger.info("MCP HTTP request method: %s, id: %s", method, id)
+
+    # Constant replies cannot fail, so they skip the exception handling below.
+    if method == "initialize" and resources:
+        return _constant_reply(id, _INITIALIZE_RESULT, _INITIALIZE_RESULT_BYTES, batched)
+    if method == "initialize":
+        return _constant_reply(id, _TOOLS_ONLY_INITIALIZE_RESULT, _TOOLS_ONLY_INITIALIZE_RESULT_BYTES, batched)
+    if method == "tools/list":
+        return _constant_reply(id, _TOOLS_LIST_RESULT, _TOOLS_LIST_RESULT_BYTES, batched)
+    if method == "resources/list" and resources:
+        return _constant_reply(id, _RESOURCES_LIST_RESULT, _RESOURCES_LIST_RESULT_BYTES, batched)
+    if method != "tools/call" and not (method == "resources/read" and resources):
+        return _jsonrpc_error(id, _ERR_METHOD_NOT_FOUND, 404)
+
+    try:
+        params = data.get("params", {})
+
+        if method == "tools/call":
+            # Call tool
+            tool_name = params.get("name")
+            tool_args = params.get("arguments", {})
+
+            async with limiter:
+                try:
+                    tool = _TOOL_DISPATCH.get(tool_name)
+                    if tool is None:
+                        return _jsonrpc_error(id, _ERR_METHOD_NOT_FOUND, 404)
+                    result = await tool(service, tool_args, response_handler)
+
+                    response = {
+                        "jsonrpc": "2.0",
+                        "id": id,
+                        "result": result
+                    }
+                    return response, 200
+                except Exception as exc:
+                    logger.error("Tool call error: %s", exc)
+                    return _jsonrpc_error(id, {"code": -32000, "message": str(exc)}, 500)
+
+        # Read resource
+        uri = params.get("uri")
+        async with limiter:
+            try:
+                if uri == "memory://sessions":
+                    content = orjson.dumps({"sessions": await service.alist_sessions()}).decode()
+                elif uri == "memory://health":
+                    content = orjson.dumps({"status": "ok", "conversation_limit": settings.conversation_history_limit}).decode()
+                else:
+                    return _jsonrpc_error(id, _ERR_INVALID_PARAMS, 400)
+
+                response = {
+                    "jsonrpc": "2.0",
+                    "id": id,
+                    "result": {
+                        "contents": [{
+                            "uri": uri,
+                            "mimeType": "application/json",
+                            "text": content
+                        }]
+                    }
+                }
+                return response, 200
+            except Exception as exc:
+                logger.error("Resource read error: %s", exc)
+                return _jsonrpc_error(id, {"code": -32000, "message": str(exc)}, 500)
+
+    except Exception as exc:
+        logger.error("MCP HTTP error: %s", exc)
+        return _jsonrpc_error(None, _ERR_PARSE, 400)
+
+
+async def _periodic_cleanup(store: ConversationStore, retention_days: int) -> None:
+    """Prune expired messages now and then every ``MESSAGE_CLEANUP_INTERVAL`` seconds."""
+    while True:
+        try:
+            deleted_count = await store.adelete_old_messages(retention_days)
+            if deleted_count > 0:
+                logger.info("Cleaned up %d old messages (older than %d days)", deleted_count, retention_days)
+        except Exception as exc:
+            logger.warning("Failed to clean up old messages: %s", exc)
+        await asyncio.sleep(MESSAGE_CLEANUP_INTERVAL)
+
+
+def _build_lifespan(
+    dispatcher: FrontendWebhookDispatcher | None,
+    store: ConversationStore,
+    settings: Settings,
+    relay: RedisResponseRelay | None = None,
+):
+    """Return a Starlette lifespan that runs retention cleanup and drains background work on shutdown."""
+
+    @asynccontextmanager
+    async def lifespan(_: Starlette) -> AsyncIterator[None]:
+        cleanup = asyncio.create_task(_periodic_cleanup(store, settings.message_retention_days))
+        try:
+            yield
+        finally:
+            cleanup.cancel()
+            await asyncio.gather(cleanup, return_exceptions=True)
+            if dispatcher is not None:
+                await dispatcher.aclose()
+            if relay is not None:
+                await relay.aclose()
+
+    return lifespan
+
+
+def _build_websocket_app(
+    server: FastMCP,
+    settings: Settings,
+    client: AIWebhookClient | None = None,
+    *,
+    dispatcher: FrontendWebhookDispatcher | None = None,
+    relay: RedisResponseRelay | None = None,
+) -> Starlette:
+    """Build the combined app; ``dispatcher`` and ``relay`` should be the ones handed to ``build_server``.
+
+    The app's lifespan drains and closes them on shutdown. Each is built from settings when
+    none is given.
+    """
+    store = get_store(settings.conversation_db_path, settings.session_cache_ttl)
+    dispatcher = dispatcher or build_frontend_dispatcher(settings)
+    relay = relay or build_response_relay(settings)
+    response_handler = build_response_handler(settings, dispatcher=dispatcher, relay=relay)
     
     memory_server = build_memory_server(store, settings, response_handler=response_handler)
+    # Caps tool calls and resource reads in flight so bursts queue instead of piling onto SQLite.
+    rpc_limiter = asyncio.Semaphore(settings.mcp_max_concurrent_rpc)
     memory_service = MemoryService(store, settings)
+    # Initialization options are read-only, so build them once rather than per WebSocket accept.
+    memory_init_options = memory_server._mcp_server.create_initialization_options()
+    server_init_options = server._mcp_server.create_initialization_options()
 
-    async def health(_: Request) -> Response:
-        return JSONResponse({"status": "ok"})
+    # The model listing only depends on settings, so serialize it once per app.
+    models_body = orjson.dumps(
+        {
+            "object": "list",
+            "data": [
+                {
+                    "id": settings.model_name,
+                    "object": "model",
+                    "created": 1640995200,
+                    "owned_by": "Antonio Archer Custom MCP server"
+                }
+            ]
+        }
+    )
 
     async def index(_: Request) -> Response:
         return PlainTextResponse("external-ai MCP Bridge WebSocket endpoints at /mcp/openai and /mcp/hook.")
@@ -50,37 +695,35 @@ def _build_websocket_app(server: FastMCP, settings: Settings, client: AIWebhookC
     async def callback(request: Request) -> Response:
         """Endpoint for AI to send follow-up messages."""
         try:
-            data = await request.json()
+            data = await read_json(request)
         except Exception as exc:
             logger.error("Callback failed to parse JSON: %s", exc)
-            return JSONResponse({"error": "Invalid JSON"}, status_code=400)
+            return ORJSONResponse({"error": "Invalid JSON"}, status_code=400)
 
         if not isinstance(data, dict):
             logger.error("Callback received non-dict data: %s", type(data))
-            return JSONResponse({"error": "Invalid JSON"}, status_code=400)
+            return ORJSONResponse({"error": "Invalid JSON"}, status_code=400)
 
-        logger.info("🔄 Callback received from AI: %s", data)
+        logger.debug("Callback received from AI: %s", data)
         try:
-            record = memory_service.record_ai_response(payload=data)
-            logger.info("✅ Recorded AI response: %s", record)
+            record = await memory_service.arecord_ai_response(payload=data)
         except ValueError as exc:
             logger.error("❌ Callback validation error: %s", exc)
-            return JSONResponse({"error": str(exc)}, status_code=400)
+            return ORJSONResponse({"error": str(exc)}, status_code=400)
         except Exception as exc:
             logger.error("❌ Callback error while storing message: %s", exc)
-            return JSONResponse({"error": "Failed to process callback"}, status_code=500)
+            return ORJSONResponse({"error": "Failed to process callback"}, status_code=500)
 
-        logger.info("📤 Dispatching response via handler")
         await response_handler(record)
-        logger.info("✅ Callback message received and dispatched: %s", data)
-        return JSONResponse({"status": "received", "session_id": record["session_id"]})
+        logger.info("✅ Callback recorded and dispatched for session %s", record["session_id"])
+        return ORJSONResponse({"status": "received", "session_id": record["session_id"]})
 
     async def mcp_memory_ws(websocket: WebSocket) -> None:
         async with websocket_server(websocket.scope, websocket.receive, websocket.send) as streams:
             await memory_server._mcp_server.run(  # noqa: SLF001 - accessing private attr for transport wiring
                 streams[0],
                 streams[1],
-                memory_server._mcp_server.create_initialization_options(),
+                memory_init_options,
             )
 
     async def mcp_ws(websocket: WebSocket) -> None:
@@ -88,205 +731,72 @@ def _build_websocket_app(server: FastMCP, settings: Settings, client: AIWebhookC
             await server._mcp_server.run(  # noqa: SLF001 - accessing private attr for transport wiring
                 streams[0],
                 streams[1],
-                server._mcp_server.create_initialization_options(),
+                server_init_options,
             )
 
     async def openapi(request: Request) -> Response:
-        base_url = str(request.base_url).rstrip("/")
-        schema = {
-            "openapi": "3.0.3",
-            "info": {
-                "title": "external-ai MCP Bridge",
-                "version": "0.1.0",
-                "description": (
-                    "Minimal OpenAPI description exposing health checks for the external-ai MCP bridge. "
-                    "The actual MCP interaction occurs over the WebSocket endpoint documented in the "
-                    "x-mcp extension."
-                ),
-            },
-            "servers": [{"url": base_url}],
-            "paths": {
-                "/healthz": {
-                    "get": {
-                        "summary": "Service health check",
-                        "responses": {
-                            "200": {
-                                "description": "Service healthy",
-                                "content": {
-                                    "application/json": {
-                                        "schema": {
-                                            "type": "object",
-                                            "properties": {
-                                                "status": {"type": "string"},
-                                            },
-                                        }
-                                    }
-                                },
-                            }
-                        },
-                    }
-                }
-            },
-            "components": {},
-            "x-mcp": {
-                "transport": "websocket",
-                "endpoint": f"{base_url}/mcp/openai",
-                "notes": "Clients should open a WebSocket connection using the MCP subprotocol."
-            },
-        }
-        headers = {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, OPTIONS",
-            "Access-Control-Allow-Headers": "*",
-        }
-
-        if request.method == "OPTIONS":
-            return Response(status_code=204, headers=headers)
-
-        return JSONResponse(schema, headers=headers)
+        return Response(_openapi_body(_MCP_OPENAPI_TEMPLATE, request), media_type="application/json")
 
     async def openai_openapi(request: Request) -> Response:
         """Return a minimal OpenAPI spec for the chat completions endpoint."""
-        base_url = str(request.base_url).rstrip("/")
-        schema = {
-            "openapi": "3.0.3",
-            "info": {
-                "title": "external-ai Chat Completions",
-                "version": "1.0.0",
-                "description": "OpenAI-compatible chat completions API"
-            },
-            "servers": [{"url": base_url}],
-            "paths": {
-                "/v1/chat/completions": {
-                    "post": {
-                        "summary": "Create chat completion",
-                        "requestBody": {
-                            "required": True,
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "messages": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "role": {"type": "string"},
-                                                        "content": {"type": "string"}
-                                                    }
-                                                }
-                                            },
-                                            "stream": {"type": "boolean"}
-                                        }
-                                    }
-                                }
-                            },
-                            "responses": {
-                                "200": {
-                                    "description": "Successful response",
-                                    "content": {
-                                        "application/json": {
-                                            "schema": {"type": "object"}
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        }
-        return JSONResponse(schema)
+        return Response(_openapi_body(_CHAT_OPENAPI_TEMPLATE, request), media_type="application/json")
 
     async def openai_models(request: Request) -> Response:
         """Return list of available models in OpenAI format."""
-        models = {
-            "object": "list",
-            "data": [
-                {
-                    "id": settings.model_name,
-                    "object": "model",
-                    "created": 1640995200,
-                    "owned_by": "Antonio Archer Custom MCP server"
-                }
-            ]
-        }
-        return JSONResponse(models)
+        return Response(models_body, media_type="application/json")
 
     async def openai_chat(request: Request) -> Response:
         if not client:
-            return JSONResponse({"error": "Client not configured"}, status_code=500)
+            return ORJSONResponse({"error": "Client not configured"}, status_code=500)
+        session_id: str | None = None
+        waiter: asyncio.Future | asyncio.Queue | None = None
+        listener: RelaySubscription | None = None
         try:
-            data = await request.json()
-            logger.info("Received OpenAI chat request: %s", data)
+            data = await read_json(request)
+            logger.debug("Received OpenAI chat request: %s", data)
             messages = data.get("messages", [])
-            if not messages:
-                return JSONResponse({"error": "No messages"}, status_code=400)
+            if not messages or not isinstance(messages, list):
+                return ORJSONResponse({"error": "No messages"}, status_code=400)
             
             # Get the last user message
-            prompt = ""
-            for msg in reversed(messages):
-                if msg.get("role") == "user":
-                    prompt = msg.get("content", "")
-                    break
+            prompt = next(
+                (msg.get("content", "") for msg in reversed(messages) if isinstance(msg, dict) and msg.get("role") == "user"),
+                "",
+            )
             if not prompt:
-                return JSONResponse({"error": "No user message"}, status_code=400)
-
-            def _extract_session_id(payload: dict[str, Any]) -> str | None:
-                """Find a caller-provided session identifier, recursing into common wrappers."""
-                candidate_keys = (
-                    "session_id",
-                    "sessionID",
-                    "sessionId",
-                    "conversation_id",
-                    "conversationID",
-                    "conversationId",
-                )
-                for key in candidate_keys:
-                    value = payload.get(key)
-                    if isinstance(value, str) and value:
-                        return value
-
-                for nested_key in ("body", "payload", "data"):
-                    nested = payload.get(nested_key)
-                    if isinstance(nested, dict):
-                        nested_value = _extract_session_id(nested)
-                        if nested_value:
-                            return nested_value
-                return None
-
-            supplied_session = _extract_session_id(data)
-            session_id = supplied_session or str(uuid.uuid4())
-
-            history = store.get_messages(session_id, limit=settings.conversation_history_limit)
+                return ORJSONResponse({"error": "No user message"}, status_code=400)
+
+            supplied_session = _chat_session_id(data)
+            session_id = supplied_session or secrets.token_hex(16)
+
+            history = await store.aget_messages(session_id, limit=settings.conversation_history_limit)
             history_text = ""
             if history:
                 history_text = format_history_for_prompt(history)
-            notice = (
-                f"You are a memory coordination assistant for the NinjaCat service.\n\n"
-                f"**Instructions:**\n"
-                f"1. Use the available MCP tools listed below to process the user's request.\n"
-                f"2. Recall the full context of the current conversation using the `recall_conversation_context` tool and the provided session ID.\n"
-                f"3. Even if no relevant information is found, you MUST respond using `send_user_response`.\n"
-                f"4. `send_user_response` is the ONLY valid way to reply to the user and OpenWebUI.\n\n"
-                f"**Available MCP tools:** list_conversations, get_conversation, recall_conversation_context, send_user_response\n"
-                f"**Session ID:** {session_id}\n"
-            )
-            final_prompt = prompt
+            notice = _NOTICE_TEMPLATE % session_id
             if history_text:
                 final_prompt = (
                     "Conversation history to help you stay consistent:\n"
                     f"{history_text}\n\n"
-                    f"Latest user message:\n{prompt}"
+                    f"Latest user message:\n{prompt}{notice}"
                 )
-            final_prompt = f"{final_prompt}{notice}"
-
-            queue = asyncio.Queue()
-            pending_responses[session_id] = queue
+            else:
+                final_prompt = prompt + notice
+
+            # Streams relay every payload; a plain reply only needs the first one.
+            stream = bool(data.get("stream"))
+            waiter = asyncio.Queue() if stream else asyncio.get_running_loop().create_future()
+            pending_responses[session_id] = waiter
+            # Subscribe before the prompt goes out so a reply delivered to another worker is not missed.
+            if relay is not None:
+                try:
+                    listener = await relay.subscribe(session_id)
+                except Exception as exc:
+                    # Without the relay only a reply that reaches this worker completes the request.
+                    logger.error("❌ Relay subscribe failed for session %s; waiting locally only: %s", session_id, exc)
 
             try:
-                store.record_message(
+                await store.arecord_message(
                     session_id,
                     "user",
                     prompt,
@@ -296,25 +806,37 @@ def _build_websocket_app(server: FastMCP, settings: Settings, client: AIWebhookC
                 logger.error("Failed to store user prompt: %s", exc)
 
             payload = {"prompt": final_prompt, "sessionID": session_id}
-            logger.info("Sending to backend: %s", payload)
+            logger.info("Sending chat prompt to backend for session %s", session_id)
+            logger.debug("Backend payload: %s", payload)
             await client.start_message(payload)
+
+            if stream:
+                return _ChatStreamResponse(
+                    _stream_chat_completion(waiter, session_id, settings.model_name, listener),
+                    session_id=session_id,
+                    waiter=waiter,
+                    listener=listener,
+                    media_type="text/event-stream",
+                    headers={"Cache-Control": "no-cache"},
+                )
             
             # Wait for response
             try:
-                response_data = await asyncio.wait_for(queue.get(), timeout=4120.0)
-                logger.info("Received response from backend: %s", response_data)
+                response_data = await asyncio.wait_for(waiter, timeout=CHAT_RESPONSE_TIMEOUT)
+                logger.debug("Received response from backend: %s", response_data)
             except asyncio.TimeoutError:
-                if session_id in pending_responses:
-                    del pending_responses[session_id]
                 logger.error("Timeout waiting for callback from backend")
-                return JSONResponse({"error": {"message": "Backend did not respond within timeout period. Please try again.", "type": "timeout"}}, status_code=504)
-            
-            if session_id in pending_responses:
-                del pending_responses[session_id]
-            
+                return ORJSONResponse({"error": {"message": "Backend did not respond within timeout period. Please try again.", "type": "timeout"}}, status_code=504)
+            finally:
+                await _release_chat_waiter(session_id, waiter, listener)
+
             # Format as proper OpenAI chat completion response
             content = response_data.get("message", "")
             
+            # Usage is a word-count approximation; count each text once.
+            prompt_tokens = len(prompt.split())
+            completion_tokens = len(content.split())
+
             # Return proper OpenAI-compatible response format
             response_obj = {
                 "id": f"chatcmpl-{session_id}",
@@ -332,470 +854,104 @@ def _build_websocket_app(server: FastMCP, settings: Settings, client: AIWebhookC
                     }
                 ],
                 "usage": {
-                    "prompt_tokens": len(prompt.split()),
-                    "completion_tokens": len(content.split()),
-                    "total_tokens": len(prompt.split()) + len(content.split())
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
                 }
             }
-            logger.info("Returning OpenAI response: %s", response_obj)
-            return JSONResponse(response_obj)
+            logger.info("Returning chat completion for session %s (%d chars)", session_id, len(content))
+            return ORJSONResponse(response_obj)
         except Exception as exc:
             logger.error("OpenAI chat error: %s", exc)
-            return JSONResponse({"error": "Internal error"}, status_code=500)
+            if session_id is not None:
+                await _release_chat_waiter(session_id, waiter, listener)
+            return ORJSONResponse({"error": "Internal error"}, status_code=500)
+
+    dispatch_jsonrpc = functools.partial(
+        _dispatch_jsonrpc,
+        service=memory_service,
+        response_handler=response_handler,
+        settings=settings,
+        limiter=rpc_limiter,
+        resources=True,
+    )
 
     async def mcp_memory_http(request: Request) -> Response:
         """Handle MCP protocol over HTTP using JSON-RPC for memory tools."""
-        if request.method != "POST":
-            return JSONResponse({"error": "Method not allowed"}, status_code=405)
-        
-        try:
-            data = await request.json()
-            if not isinstance(data, dict):
-                return JSONResponse({"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}}, status_code=400)
-            
-            method = data.get("method")
-            params = data.get("params", {})
-            id = data.get("id")
-            
-            # Handle notifications (no id)
-            if id is None:
-                logger.info("Received MCP notification: %s", method)
-                return Response(status_code=204)
-            
-            if not method:
-                return JSONResponse({"jsonrpc": "2.0", "id": id, "error": {"code": -32700, "message": "Parse error"}}, status_code=400)
-            
-            logger.info("MCP HTTP request method: %s, id: %s", method, id)
-            
-            service = MemoryService(store, settings)
-            
-            if method == "initialize":
-                # Handle initialize
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": id,
-                    "result": {
-                        "protocolVersion": "2024-11-05",
-                        "capabilities": {
-                            "tools": {"listChanged": True},
-                            "resources": {"listChanged": True}
-                        },
-                        "serverInfo": {
-                            "name": "conversation-memory",
-                            "version": "0.1.0"
-                        }
-                    }
-                }
-                return JSONResponse(response)
-            
-            elif method == "tools/list":
-                # List memory tools
-                tools = [
-                    {
-                        "name": "list_conversations",
-                        "description": "Return the most recently updated sessions stored in the memory DB.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "limit": {"type": ["integer", "null"], "description": "Maximum number of sessions to return"}
-                            }
-                        }
-                    },
-                    {
-                        "name": "get_conversation",
-                        "description": "Dump role/content/metadata for a session.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "session_id": {"type": "string", "description": "Session ID to retrieve"},
-                                "limit": {"type": ["integer", "null"], "description": "Maximum number of messages to return"}
-                            },
-                            "required": ["session_id"]
-                        }
-                    },
-                    {
-                        "name": "recall_conversation_context",
-                        "description": "Return a context block plus separated user/assistant turns for a session.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "session_id": {"type": "string", "description": "Session ID to recall"},
-                                "limit": {"type": ["integer", "null"], "description": "Maximum number of messages to include"}
-                            },
-                            "required": ["session_id"]
-                        }
-                    },
-                    {
-                        "name": "delete_conversation",
-                        "description": "Remove a stored session and all of its messages.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "session_id": {"type": "string", "description": "Session ID to delete"}
-                            },
-                            "required": ["session_id"]
-                        }
-                    },
-                    {
-                        "name": "send_user_response",
-                        "description": "Send the AI response back to the user and OpenWebUI. MUST be called with your response message after receiving a prompt. This records the response in conversation memory and sends it to the client.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "session_id": {"type": ["string", "null"], "description": "Session ID to record response in"},
-                                "message": {"type": ["string", "null"], "description": "The response message content from the AI"},
-                                "payload": {"type": ["object", "null"], "description": "Additional payload data"},
-                                "role": {"type": ["string", "null"], "description": "Role of the message sender (defaults to 'user')"},
-                                "status": {"type": ["string", "null"], "description": "Status of the response"}
-                            },
-                            "required": ["message"]
-                        }
-                    }
-                ]
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": id,
-                    "result": {"tools": tools}
-                }
-                return JSONResponse(response)
-            
-            elif method == "tools/call":
-                # Call tool
-                tool_name = params.get("name")
-                tool_args = params.get("arguments", {})
-                
-                try:
-                    if tool_name == "list_conversations":
-                        limit = tool_args.get("limit")
-                        result = {"sessions": service.list_sessions(limit=limit)}
-                    elif tool_name == "get_conversation":
-                        session_id = tool_args["session_id"]
-                        limit = tool_args.get("limit")
-                        result = service.conversation_detail(session_id, limit)
-                    elif tool_name == "recall_conversation_context":
-                        session_id = tool_args["session_id"]
-                        limit = tool_args.get("limit")
-                        result = service.recall_memory(session_id, limit)
-                    elif tool_name == "delete_conversation":
-                        session_id = tool_args["session_id"]
-                        service.delete_session(session_id)
-                        result = {"status": "deleted", "session_id": session_id}
-                    elif tool_name == "send_user_response":
-                        session_id = tool_args.get("session_id")
-                        message = tool_args.get("message")
-                        payload = tool_args.get("payload")
-                        role = tool_args.get("role") or "user"
-                        status = tool_args.get("status")
-                        logger.info("📨 AI called send_user_response tool: session_id=%s, message=%s, role=%s, status=%s", session_id, message, role, status)
-                        result = service.record_ai_response(
-                            session_id=session_id,
-                            message=message,
-                            payload=payload,
-                            role=role,
-                            status=status,
-                        )
-                        logger.info("✅ Recorded AI response via tool: %s", result)
-                        # Dispatch the response to OpenWebUI
-                        logger.info("📤 Dispatching AI response via handler")
-                        await response_handler(result)
-                        logger.info("✅ AI response dispatched successfully")
-                    else:
-                        return JSONResponse({"jsonrpc": "2.0", "id": id, "error": {"code": -32601, "message": "Method not found"}}, status_code=404)
-                    
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": id,
-                        "result": result
-                    }
-                    return JSONResponse(response)
-                except Exception as exc:
-                    logger.error("Tool call error: %s", exc)
-                    return JSONResponse({"jsonrpc": "2.0", "id": id, "error": {"code": -32000, "message": str(exc)}}, status_code=500)
-            
-            elif method == "resources/list":
-                # List memory resources
-                resources = [
-                    {
-                        "uri": "memory://sessions",
-                        "name": "Conversation Sessions",
-                        "description": "List of all conversation sessions",
-                        "mimeType": "application/json"
-                    },
-                    {
-                        "uri": "memory://health",
-                        "name": "Memory Service Health",
-                        "description": "Health status of the memory service",
-                        "mimeType": "application/json"
-                    }
-                ]
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": id,
-                    "result": {"resources": resources}
-                }
-                return JSONResponse(response)
-            
-            elif method == "resources/read":
-                # Read resource
-                uri = params.get("uri")
-                try:
-                    if uri == "memory://sessions":
-                        content = json.dumps({"sessions": service.list_sessions()}, indent=2)
-                    elif uri == "memory://health":
-                        content = json.dumps({"status": "ok", "conversation_limit": settings.conversation_history_limit}, indent=2)
-                    else:
-                        return JSONResponse({"jsonrpc": "2.0", "id": id, "error": {"code": -32602, "message": "Invalid params"}}, status_code=400)
-                    
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": id,
-                        "result": {
-                            "contents": [{
-                                "uri": uri,
-                                "mimeType": "application/json",
-                                "text": content
-                            }]
-                        }
-                    }
-                    return JSONResponse(response)
-                except Exception as exc:
-                    logger.error("Resource read error: %s", exc)
-                    return JSONResponse({"jsonrpc": "2.0", "id": id, "error": {"code": -32000, "message": str(exc)}}, status_code=500)
-            
-            else:
-                return JSONResponse({"jsonrpc": "2.0", "id": id, "error": {"code": -32601, "message": "Method not found"}}, status_code=404)
-        
-        except Exception as exc:
-            logger.error("MCP HTTP error: %s", exc)
-            return JSONResponse({"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}}, status_code=400)
+        return await _handle_jsonrpc_http(request, dispatch_jsonrpc, settings.mcp_max_batch_size)
 
-    memory_routes = build_memory_routes(store, settings)
+    memory_routes = build_memory_routes(store, settings, service=memory_service)
 
     routes = [
+        # Starlette matches routes in order, so the high-traffic paths come first.
+        Route("/healthz", _health),
+        Route("/v1/chat/completions", openai_chat, methods=["POST"]),
+        Route("/callback", callback, methods=["POST"]),
+        Route("/mcp/hook", mcp_memory_http, methods=["POST"]),
+        Route("/mcp/memory", mcp_memory_http, methods=["POST"]),
+        Route("/mcp/openai/v1/chat/completions", openai_chat, methods=["POST"]),
         Route("/", index),
-        Route("/healthz", health),
         Route("/docs", swagger_ui_handler),
         Route("/openapi.json", openapi_json_handler),
-        Route("/callback", callback, methods=["POST"]),
         Route("/mcp/openapi.json", openapi),
-        Route("/v1/chat/completions", openai_chat, methods=["POST"]),
         Route("/v1/chat/completions/openapi.json", openai_openapi),
         Route("/v1/models", openai_models),
-        Route("/mcp/openai/v1/chat/completions", openai_chat, methods=["POST"]),
-        Route("/mcp/hook", mcp_memory_http, methods=["POST"]),
-        Route("/mcp/memory", mcp_memory_http, methods=["POST"]),
         WebSocketRoute("/mcp/openai", mcp_ws),
         WebSocketRoute("/mcp/hook", mcp_memory_ws),
         WebSocketRoute("/mcp/memory", mcp_memory_ws),
     ] + memory_routes
-    middleware = build_middleware(settings, exempt_paths={"/healthz", "/docs", "/openapi.json"})
+    middleware = build_middleware(settings, exempt_paths=_AUTH_EXEMPT_PATHS)
 
-    return Starlette(routes=routes, middleware=middleware)
+    return Starlette(routes=routes, middleware=middleware, lifespan=_build_lifespan(dispatcher, store, settings, relay))
 
 def _build_memory_websocket_app(settings: Settings) -> Starlette:
-    store = ConversationStore(settings.conversation_db_path)
-    response_handler = build_response_handler(settings)
-    
-    # Clean up old messages on startup
-    try:
-        deleted_count = store.delete_old_messages(settings.message_retention_days)
-        if deleted_count > 0:
-            logger.info("Cleaned up %d old messages (older than %d days)", deleted_count, settings.message_retention_days)
-    except Exception as exc:
-        logger.warning("Failed to clean up old messages: %s", exc)
+    store = get_store(settings.conversation_db_path, settings.session_cache_ttl)
+    dispatcher = build_frontend_dispatcher(settings)
+    relay = build_response_relay(settings)
+    response_handler = build_response_handler(settings, dispatcher=dispatcher, relay=relay)
     
     memory_server = build_memory_server(store, settings, response_handler=response_handler)
-
-    async def health(_: Request) -> Response:
-        return JSONResponse({"status": "ok"})
+    memory_service = MemoryService(store, settings)
+    # Caps tool calls and resource reads in flight so bursts queue instead of piling onto SQLite.
+    rpc_limiter = asyncio.Semaphore(settings.mcp_max_concurrent_rpc)
+    memory_init_options = memory_server._mcp_server.create_initialization_options()
 
     async def index(_: Request) -> Response:
         return PlainTextResponse("Memory MCP server WebSocket endpoint at /mcp/hook.")
 
+    dispatch_jsonrpc = functools.partial(
+        _dispatch_jsonrpc,
+        service=memory_service,
+        response_handler=response_handler,
+        settings=settings,
+        limiter=rpc_limiter,
+        resources=False,
+    )
+
     async def mcp_memory_http(request: Request) -> Response:
         """Handle MCP protocol over HTTP using JSON-RPC."""
-        if request.method != "POST":
-            return JSONResponse({"error": "Method not allowed"}, status_code=405)
-        
-        try:
-            data = await request.json()
-            if not isinstance(data, dict) or "method" not in data:
-                return JSONResponse({"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}}, status_code=400)
-            
-            method = data["method"]
-            params = data.get("params", {})
-            id = data.get("id")
-            
-            if method == "initialize":
-                # Handle initialize
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": id,
-                    "result": {
-                        "protocolVersion": "2024-11-05",
-                        "capabilities": {
-                            "tools": {"listChanged": True}
-                        },
-                        "serverInfo": {
-                            "name": "conversation-memory",
-                            "version": "0.1.0"
-                        }
-                    }
-                }
-                return JSONResponse(response)
-            
-            elif method == "tools/list":
-                # List tools
-                tools = [
-                    {
-                        "name": "list_conversations",
-                        "description": "Return the most recently updated sessions stored in the memory DB.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "limit": {"type": ["integer", "null"], "description": "Maximum number of sessions to return"}
-                            }
-                        }
-                    },
-                    {
-                        "name": "get_conversation",
-                        "description": "Dump role/content/metadata for a session.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "session_id": {"type": "string", "description": "Session ID to retrieve"},
-                                "limit": {"type": ["integer", "null"], "description": "Maximum number of messages to return"}
-                            },
-                            "required": ["session_id"]
-                        }
-                    },
-                    {
-                        "name": "recall_conversation_context",
-                        "description": "Return a context block plus separated user/assistant turns for a session.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "session_id": {"type": "string", "description": "Session ID to recall"},
-                                "limit": {"type": ["integer", "null"], "description": "Maximum number of messages to include"}
-                            },
-                            "required": ["session_id"]
-                        }
-                    },
-                    {
-                        "name": "delete_conversation",
-                        "description": "Remove a stored session and all of its messages.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "session_id": {"type": "string", "description": "Session ID to delete"}
-                            },
-                            "required": ["session_id"]
-                        }
-                    },
-                    {
-                        "name": "send_user_response",
-                        "description": "Send the AI response back to the user and OpenWebUI. MUST be called with your response message after receiving a prompt. This records the response in conversation memory and sends it to the client.",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "session_id": {"type": ["string", "null"], "description": "Session ID to record response in"},
-                                "message": {"type": ["string", "null"], "description": "The response message content from the AI"},
-                                "payload": {"type": ["object", "null"], "description": "Additional payload data"},
-                                "role": {"type": ["string", "null"], "description": "Role of the message sender (defaults to 'user')"},
-                                "status": {"type": ["string", "null"], "description": "Status of the response"}
-                            },
-                            "required": ["message"]
-                        }
-                    }
-                ]
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": id,
-                    "result": {"tools": tools}
-                }
-                return JSONResponse(response)
-            
-            elif method == "tools/call":
-                # Call tool
-                tool_name = params.get("name")
-                tool_args = params.get("arguments", {})
-                
-                service = MemoryService(store, settings)
-                
-                try:
-                    if tool_name == "list_conversations":
-                        limit = tool_args.get("limit")
-                        result = {"sessions": service.list_sessions(limit=limit)}
-                    elif tool_name == "get_conversation":
-                        session_id = tool_args["session_id"]
-                        limit = tool_args.get("limit")
-                        result = service.conversation_detail(session_id, limit)
-                    elif tool_name == "recall_conversation_context":
-                        session_id = tool_args["session_id"]
-                        limit = tool_args.get("limit")
-                        result = service.recall_memory(session_id, limit)
-                    elif tool_name == "delete_conversation":
-                        session_id = tool_args["session_id"]
-                        service.delete_session(session_id)
-                        result = {"status": "deleted", "session_id": session_id}
-                    elif tool_name == "send_user_response":
-                        session_id = tool_args.get("session_id")
-                        message = tool_args.get("message")
-                        payload = tool_args.get("payload")
-                        role = tool_args.get("role") or "user"
-                        status = tool_args.get("status")
-                        logger.info("📨 AI called send_user_response tool: session_id=%s, message=%s, role=%s, status=%s", session_id, message, role, status)
-                        result = service.record_ai_response(
-                            session_id=session_id,
-                            message=message,
-                            payload=payload,
-                            role=role,
-                            status=status,
-                        )
-                        logger.info("✅ Recorded AI response via tool: %s", result)
-                        # Dispatch the response to OpenWebUI
-                        logger.info("📤 Dispatching AI response via handler")
-                        await response_handler(result)
-                        logger.info("✅ AI response dispatched successfully")
-                    else:
-                        return JSONResponse({"jsonrpc": "2.0", "id": id, "error": {"code": -32601, "message": "Method not found"}}, status_code=404)
-                    
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": id,
-                        "result": result
-                    }
-                    return JSONResponse(response)
-                except Exception as exc:
-                    logger.error("Tool call error: %s", exc)
-                    return JSONResponse({"jsonrpc": "2.0", "id": id, "error": {"code": -32000, "message": str(exc)}}, status_code=500)
-            
-            else:
-                return JSONResponse({"jsonrpc": "2.0", "id": id, "error": {"code": -32601, "message": "Method not found"}}, status_code=404)
-        
-        except Exception as exc:
-            logger.error("MCP HTTP error: %s", exc)
-            return JSONResponse({"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}}, status_code=400)
+        return await _handle_jsonrpc_http(request, dispatch_jsonrpc, settings.mcp_max_batch_size)
 
     async def mcp_memory_ws(websocket: WebSocket) -> None:
         async with websocket_server(websocket.scope, websocket.receive, websocket.send) as streams:
             await memory_server._mcp_server.run(  # noqa: SLF001 - accessing private attr for transport wiring
                 streams[0],
                 streams[1],
-                memory_server._mcp_server.create_initialization_options(),
+                memory_init_options,
             )
 
-    memory_routes = build_memory_routes(store, settings)
+    memory_routes = build_memory_routes(store, settings, service=memory_service)
 
     routes = [
+        # Starlette matches routes in order, so the high-traffic paths come first.
+        Route("/healthz", _health),
+        Route("/mcp/hook", mcp_memory_http, methods=["POST"]),
+        Route("/mcp/memory", mcp_memory_http, methods=["POST"]),
         Route("/", index),
-        Route("/healthz", health),
         Route("/docs", swagger_ui_handler),
         Route("/openapi.json", openapi_json_handler),
-        Route("/mcp/hook", mcp_memory_http, methods=["POST"]),
-        Route("/mcp/memory", mcp_memory_http, methods=["POST"]),
         WebSocketRoute("/mcp/hook", mcp_memory_ws),
         WebSocketRoute("/mcp/memory", mcp_memory_ws),
     ] + memory_routes
-    middleware = build_middleware(settings, exempt_paths={"/healthz", "/docs", "/openapi.json"})
-    return Starlette(routes=routes, middleware=middleware)
+    middleware = build_middleware(settings, exempt_paths=_AUTH_EXEMPT_PATHS)
+    return Starlette(routes=routes, middleware=middleware, lifespan=_build_lifespan(dispatcher, store, settings, relay))
@@ -1,23 +1,38 @@
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
+import orjson
 from mcp.server.fastmcp import FastMCP
 
 from ..ai_client import AIWebhookClient, AIWebhookError
 from ..config import Settings
 from ..memory_api import register_memory_mcp_surface
-from ..storage import ConversationStore
-from .response_handler import build_response_handler
-from .state import callback_messages
+from .relay import RedisResponseRelay, build_response_relay
+from .response_handler import (
+    FrontendWebhookDispatcher,
+    build_frontend_dispatcher,
+    build_response_handler,
+)
+from .state import callback_messages_json, get_store, set_callback_history_size
 
 logger = logging.getLogger(__name__)
 
 
-def build_server(settings: Settings, client: AIWebhookClient | None = None) -> FastMCP:
-    """Construct an MCP server instance."""
+def build_server(
+    settings: Settings,
+    client: AIWebhookClient | None = None,
+    *,
+    dispatcher: FrontendWebhookDispatcher | None = None,
+    relay: RedisResponseRelay | None = None,
+) -> FastMCP:
+    """Construct an MCP server instance.
+
+    ``dispatcher`` forwards ``send_user_response`` callbacks to the frontend webhook and ``relay``
+    routes them to other workers. Pass the ones whose owner closes them on shutdown (the app
+    lifespan, or ``run_stdio``) so queued callbacks are kept and no client is left open.
+    """
     ai_client = client or AIWebhookClient(
         str(settings.ai_webhook_url),
         api_key=settings.ai_api_key,
@@ -40,16 +55,14 @@ def build_server(settings: Settings, client: AIWebhookClient | None = None) -> F
         website_url="https://openwebui.com",
     )
 
-    response_handler = build_response_handler(settings)
+    set_callback_history_size(settings.callback_history_size)
+    response_handler = build_response_handler(settings, dispatcher=dispatcher, relay=relay)
     try:
-        store = ConversationStore(settings.conversation_db_path)
+        store = get_store(settings.conversation_db_path, settings.session_cache_ttl)
         register_memory_mcp_surface(mcp, store, settings, response_handler=response_handler)
     except Exception as exc:  # pragma: no cover - defensive fallback
         logger.warning("Failed to register memory MCP surface: %s", exc)
 
-    def _format_payload(**kwargs: Any) -> dict[str, Any]:
-        return {key: value for key, value in kwargs.items() if value is not None}
-
     @mcp.tool()
     async def start_ai_message(
         prompt: str,
@@ -60,13 +73,15 @@ def build_server(settings: Settings, client: AIWebhookClient | None = None) -> F
         extra: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         """Send a prompt to the in-house AI webhook and return its response."""
-        payload = _format_payload(
-            prompt=prompt,
-            conversation_id=conversation_id,
-            metadata=metadata,
-            attachments=attachments,
-            extra=extra,
-        )
+        payload: dict[str, Any] = {"prompt": prompt}
+        if conversation_id is not None:
+            payload["conversation_id"] = conversation_id
+        if metadata is not None:
+            payload["metadata"] = metadata
+        if attachments is not None:
+            payload["attachments"] = attachments
+        if extra is not None:
+            payload["extra"] = extra
         logger.debug("Dispatching start_ai_message payload: %s", payload)
         try:
             return await ai_client.start_message(payload)
@@ -126,10 +141,9 @@ def build_server(settings: Settings, client: AIWebhookClient | None = None) -> F
 
         return ai_response
 
-    @mcp.resource("external-ai://webhooks")
-    def list_webhooks() -> str:
-        """Expose configured webhook targets to the client."""
-        summary = {
+    # Webhook targets are fixed by configuration, so the summary is serialized once.
+    webhooks_json = orjson.dumps(
+        {
             name: {
                 "url": str(target.url),
                 "method": target.method,
@@ -138,20 +152,33 @@ def build_server(settings: Settings, client: AIWebhookClient | None = None) -> F
             }
             for name, target in settings.extra_webhooks.items()
         }
-        return json.dumps(summary, indent=2)
+    ).decode()
+
+    @mcp.resource("external-ai://webhooks")
+    def list_webhooks() -> str:
+        """Expose configured webhook targets to the client."""
+        return webhooks_json
 
     @mcp.resource("external-ai://messages")
     def list_callback_messages() -> str:
         """Return any follow-up messages captured via the response-recording MCP tool."""
-        return json.dumps(callback_messages, indent=2)
+        return callback_messages_json()
 
     return mcp
 
 
 async def run_stdio(settings: Settings) -> None:
     """Run the server over stdio (for OpenWebUI adapters)."""
-    server = build_server(settings)
-    await server.run_stdio_async()
+    dispatcher = build_frontend_dispatcher(settings)
+    relay = build_response_relay(settings)
+    server = build_server(settings, dispatcher=dispatcher, relay=relay)
+    try:
+        await server.run_stdio_async()
+    finally:
+        if dispatcher is not None:
+            await dispatcher.aclose()
+        if relay is not None:
+            await relay.aclose()
 
 
 __all__ = ["build_server", "run_stdio"]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Set
+from typing import AbstractSet
 
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
@@ -12,7 +12,7 @@ from ..config import Settings
 logger = logging.getLogger(__name__)
 
 
-def build_auth_middleware(settings: Settings, *, exempt_paths: Set[str] | None = None) -> Middleware | None:
+def build_auth_middleware(settings: Settings, *, exempt_paths: AbstractSet[str] | None = None) -> Middleware | None:
     """Configure bearer auth middleware if tokens exist."""
     if not settings.bearer_auth_enabled:
         return None
@@ -28,24 +28,25 @@ def build_auth_middleware(settings: Settings, *, exempt_paths: Set[str] | None =
         enabled=settings.bearer_auth_enabled,
         default_token=default_token,
         route_tokens=tokens,
-        exempt_paths=sorted(exempt_paths or set()),
+        exempt_paths=tuple(exempt_paths or ()),
     )
 
 
-def build_middleware(settings: Settings, *, exempt_paths: Set[str] | None = None) -> list[Middleware]:
+def build_middleware(settings: Settings, *, exempt_paths: AbstractSet[str] | None = None) -> list[Middleware]:
     """Return the middleware stack shared across Starlette apps."""
-    middleware: list[Middleware] = []
-    auth_middleware = build_auth_middleware(settings, exempt_paths=exempt_paths)
-    if auth_middleware:
-        middleware.append(auth_middleware)
-    middleware.append(
+    # CORS sits outermost so preflight requests are answered before auth or routing runs.
+    middleware: list[Middleware] = [
         Middleware(
             CORSMiddleware,
             allow_origins=["*"],
             allow_methods=["*"],
             allow_headers=["*"],
+            max_age=86400,
         )
-    )
+    ]
+    auth_middleware = build_auth_middleware(settings, exempt_paths=exempt_paths)
+    if auth_middleware:
+        middleware.append(auth_middleware)
     return middleware
 
 
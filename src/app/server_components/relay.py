@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+import orjson
+
+from ..config import Settings
+from .state import deliver_pending
+
+logger = logging.getLogger(__name__)
+
+
+class RelaySubscription:
+    """A session's relay subscription; ``aclose`` it once the chat request stops waiting.
+
+    The subscription owns its pubsub connection, so closing it releases the connection even if
+    the forwarding task was cancelled before it ever ran.
+    """
+
+    def __init__(self, pubsub: Any, session_id: str) -> None:
+        self._pubsub = pubsub
+        self._task = asyncio.create_task(self._forward(session_id))
+        self._closed = False
+
+    async def _forward(self, session_id: str) -> None:
+        async for message in self._pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                payload = orjson.loads(message["data"])
+            except orjson.JSONDecodeError:
+                logger.warning("⚠️ Ignoring malformed relay message for session %s", session_id)
+                continue
+            deliver_pending(session_id, payload)
+
+    async def aclose(self) -> None:
+        """Stop forwarding and close the pubsub connection; safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        try:
+            await self._pubsub.aclose()
+        except Exception as exc:  # pragma: no cover - network exception
+            logger.warning("⚠️ Failed to close relay subscription: %s", exc)
+
+
+class RedisResponseRelay:
+    """Route backend replies to whichever worker holds the waiting chat request.
+
+    Each chat request subscribes to a per-session channel while it waits, so a callback
+    that lands on a different process or node can still complete it. Redis calls give up
+    after ``timeout`` seconds so a stalled server cannot hold up callbacks or chat requests.
+    """
+
+    def __init__(self, url: str, *, channel_prefix: str = "external-ai:response:", timeout: float = 5.0) -> None:
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "REDIS_URL is set but the redis package is not installed; install external-ai-mcp[redis]."
+            ) from exc
+        self.url = url
+        self.channel_prefix = channel_prefix
+        self.timeout = timeout
+        self._redis = redis_asyncio.from_url(url)
+
+    def _channel(self, session_id: str) -> str:
+        return f"{self.channel_prefix}{session_id}"
+
+    async def publish(self, session_id: str, payload: dict[str, Any]) -> int:
+        """Publish a payload for a session; returns how many subscribers received it."""
+        return await asyncio.wait_for(
+            self._redis.publish(self._channel(session_id), orjson.dumps(payload)),
+            timeout=self.timeout,
+        )
+
+    async def subscribe(self, session_id: str) -> RelaySubscription:
+        """Forward payloads published for ``session_id`` to its local waiter until closed.
+
+        The subscription is active once this returns, so nothing published afterwards is missed.
+        """
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await asyncio.wait_for(pubsub.subscribe(self._channel(session_id)), timeout=self.timeout)
+        except BaseException:
+            await pubsub.aclose()
+            raise
+        return RelaySubscription(pubsub, session_id)
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
+
+
+def build_response_relay(settings: Settings) -> RedisResponseRelay | None:
+    """Create a relay for the configured Redis server, if any."""
+    if not settings.redis_url:
+        return None
+    return RedisResponseRelay(settings.redis_url)
+
+
+__all__ = ["RedisResponseRelay", "RelaySubscription", "build_response_relay"]
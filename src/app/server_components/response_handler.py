@@ -1,67 +1,172 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any, Awaitable, Callable
 
 import httpx
 
 from ..config import Settings
-from .state import callback_messages, pending_responses
+from .relay import RedisResponseRelay
+from .state import (
+    add_callback_message,
+    callback_messages,
+    deliver_pending,
+    pending_responses,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def build_response_handler(settings: Settings) -> Callable[[dict[str, Any]], Awaitable[None]]:
-    """Create a coroutine that fans out recorded responses to listeners."""
+class FrontendWebhookDispatcher:
+    """Deliver callback payloads to the frontend webhook from background workers."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        workers: int = 4,
+        queue_size: int = 10_000,
+        timeout: float = 10.0,
+        drain_timeout: float = 10.0,
+    ) -> None:
+        self.url = url
+        self.workers = workers
+        self.timeout = timeout
+        self.drain_timeout = drain_timeout
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=queue_size)
+        self._tasks: list[asyncio.Task[None]] = []
+        self._client = self._new_client()
+
+    def _new_client(self) -> httpx.AsyncClient:
+        # One pooled client for all workers keeps connections to the frontend alive between callbacks.
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers),
+        )
+
+    def submit(self, payload: dict[str, Any]) -> None:
+        """Queue a payload for delivery without waiting on the frontend."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        try:
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.error("❌ Frontend webhook queue is full; dropping callback for %s", self.url)
+
+    async def _worker(self) -> None:
+        while True:
+            payload = await self._queue.get()
+            try:
+                await self._post(payload)
+            finally:
+                self._queue.task_done()
+
+    async def _post(self, payload: dict[str, Any]) -> None:
+        try:
+            response = await self._client.post(self.url, json=payload)
+            if response.status_code >= 400:
+                logger.error(
+                    "❌ Frontend webhook %s returned %s: %s",
+                    self.url,
+                    response.status_code,
+                    response.text,
+                )
+            else:
+                logger.debug("Sent callback to frontend %s (status %s)", self.url, response.status_code)
+        except Exception as exc:  # pragma: no cover - network exception
+            logger.error("❌ Failed to send callback to frontend: %s", exc)
+
+    async def aclose(self) -> None:
+        """Drain queued payloads for up to ``drain_timeout`` seconds, then stop the workers and close the client."""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                # Undelivered payloads are lost either way; don't hold up shutdown for a slow frontend.
+                logger.error(
+                    "❌ Frontend webhook drain timed out after %ss; dropping %d queued callbacks for %s",
+                    self.drain_timeout,
+                    self._queue.qsize(),
+                    self.url,
+                )
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+            # Discard whatever was not delivered so a restarted app starts from an empty queue.
+            while not self._queue.empty():
+                self._queue.get_nowait()
+                self._queue.task_done()
+        await self._client.aclose()
+        # Leave a fresh client behind in case the app is started again.
+        self._client = self._new_client()
+
+
+def build_frontend_dispatcher(settings: Settings) -> FrontendWebhookDispatcher | None:
+    """Create a dispatcher for the configured frontend webhook, if any."""
+    if not settings.frontend_webhook_url:
+        return None
+    return FrontendWebhookDispatcher(
+        str(settings.frontend_webhook_url),
+        workers=settings.frontend_webhook_workers,
+        queue_size=settings.frontend_webhook_queue_size,
+        timeout=settings.frontend_webhook_timeout,
+        drain_timeout=settings.frontend_webhook_drain_timeout,
+    )
+
+
+def build_response_handler(
+    settings: Settings,
+    *,
+    dispatcher: FrontendWebhookDispatcher | None,
+    relay: RedisResponseRelay | None,
+) -> Callable[[dict[str, Any]], Awaitable[None]]:
+    """Create a coroutine that fans out recorded responses to listeners.
+
+    The coroutine only hands payloads off to in-process queues, so callers such as
+    ``send_user_response`` are never held up by a slow or unreachable frontend. When a
+    relay is configured, replies for sessions waited on by another worker are published
+    through it instead.
+
+    ``dispatcher`` and ``relay`` are owned by the caller, which must close them on shutdown;
+    pass ``None`` for whichever is not configured.
+    """
 
     async def handle(record: dict[str, Any]) -> None:
         payload = dict(record.get("payload") or {})
         session_id = record.get("session_id")
-        logger.info("🎯 Response handler called with: session_id=%s, payload=%s", session_id, payload)
+        logger.debug("Response handler called with: session_id=%s, payload=%s", session_id, payload)
 
-        callback_messages.append(payload)
-        logger.info("📝 Added to callback_messages, total count: %d", len(callback_messages))
+        add_callback_message(payload)
+        logger.debug("Added to callback_messages, total count: %d", len(callback_messages))
 
-        if session_id and session_id in pending_responses:
-            logger.info("📋 Putting response in pending queue for session %s", session_id)
-            await pending_responses[session_id].put(payload)
+        if session_id and deliver_pending(session_id, payload):
+            logger.debug("Delivered pending response for session %s", session_id)
+        elif session_id and relay is not None:
+            # The waiting chat request may live in another worker; it is subscribed to this session.
+            try:
+                await relay.publish(session_id, payload)
+                logger.debug("Published response for session %s to the relay", session_id)
+            except Exception as exc:  # pragma: no cover - network exception
+                logger.error("❌ Failed to publish response for session %s: %s", session_id, exc)
         elif session_id:
+            # The key view is only rendered if the record is actually emitted.
             logger.warning(
                 "⚠️ Session %s not found in pending_responses. Keys: %s",
                 session_id,
-                list(pending_responses.keys()),
+                pending_responses.keys(),
             )
         else:
             logger.warning("⚠️ No session_id in record")
 
-        if settings.frontend_webhook_url:
-            logger.info("🔗 Sending to frontend webhook: %s", settings.frontend_webhook_url)
-            async with httpx.AsyncClient() as http_client:
-                try:
-                    response = await http_client.post(
-                        str(settings.frontend_webhook_url),
-                        json=payload,
-                        timeout=200.0,
-                    )
-                    if response.status_code >= 400:
-                        logger.error(
-                            "❌ Frontend webhook %s returned %s: %s",
-                            settings.frontend_webhook_url,
-                            response.status_code,
-                            response.text,
-                        )
-                    else:
-                        logger.info(
-                            "✅ Sent callback to frontend %s (status %s)",
-                            settings.frontend_webhook_url,
-                            response.status_code,
-                        )
-                except Exception as exc:  # pragma: no cover - network exception
-                    logger.error("❌ Failed to send callback to frontend: %s", exc)
+        if dispatcher is not None:
+            logger.debug("Queueing callback for frontend webhook: %s", dispatcher.url)
+            dispatcher.submit(payload)
         else:
-            logger.info("ℹ️ No frontend_webhook_url configured")
+            logger.debug("No frontend_webhook_url configured")
 
     return handle
 
 
-__all__ = ["build_response_handler"]
+__all__ = ["FrontendWebhookDispatcher", "build_frontend_dispatcher", "build_response_handler"]
@@ -1,12 +1,103 @@
 from __future__ import annotations
 
 import asyncio
+import threading
+from collections import deque
+from pathlib import Path
 from typing import Any
 
-# Track callback payloads received from downstream AI webhooks.
-callback_messages: list[dict[str, Any]] = []
+import orjson
 
-# Hold pending asyncio queues per session for OpenAI-compatible streaming.
-pending_responses: dict[str, asyncio.Queue] = {}
+from ..storage import ConversationStore
 
-__all__ = ["callback_messages", "pending_responses"]
+# Track the most recent callback payloads received from downstream AI webhooks; older ones are
+# evicted once the history is full so memory and serialization stay bounded.
+callback_messages: deque[dict[str, Any]] = deque()
+_callback_history_size = 1024
+
+# Bumped on every append so the serialized snapshot below knows when it is stale.
+_callback_version = 0
+_callback_json: tuple[int, str] = (0, "[]")
+
+# Chat requests waiting on a backend reply, per session: a Future for a single
+# non-streaming reply, or a Queue when the reply is streamed.
+pending_responses: dict[str, asyncio.Future | asyncio.Queue] = {}
+
+# Queued after the final payload for a session so streaming readers know to stop.
+STREAM_END = object()
+
+
+# One store per database file, keyed by resolved path, so every caller shares its write lock
+# and connections.
+_stores: dict[Path, ConversationStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_path: str | Path, session_cache_ttl: float = 0.0) -> ConversationStore:
+    """Return the process-wide ConversationStore for a database file.
+
+    Different spellings of the same path share one store; its session cache TTL is taken
+    from the first call for that file.
+    """
+    path = Path(db_path).resolve()
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ConversationStore(path, session_cache_ttl=session_cache_ttl)
+    return store
+
+
+def deliver_pending(session_id: str, payload: dict[str, Any]) -> bool:
+    """Hand a payload to the chat request in this process waiting on ``session_id``, if any."""
+    waiter = pending_responses.get(session_id)
+    if waiter is None:
+        return False
+    if isinstance(waiter, asyncio.Future):
+        # Non-streaming requests take the first payload; later ones are only recorded.
+        if not waiter.done():
+            waiter.set_result(payload)
+    else:
+        # Pending queues are unbounded, so put_nowait never blocks or raises.
+        waiter.put_nowait(payload)
+        # "info" payloads are interim updates; anything else completes the response.
+        if payload.get("status") != "info":
+            waiter.put_nowait(STREAM_END)
+    return True
+
+
+def set_callback_history_size(size: int) -> None:
+    """Cap how many callback payloads are retained, evicting the oldest beyond it."""
+    global _callback_history_size, _callback_version
+    _callback_history_size = size
+    while len(callback_messages) > size:
+        callback_messages.popleft()
+    _callback_version += 1
+
+
+def add_callback_message(payload: dict[str, Any]) -> None:
+    """Record a callback payload and invalidate the cached JSON snapshot."""
+    global _callback_version
+    callback_messages.append(payload)
+    if len(callback_messages) > _callback_history_size:
+        callback_messages.popleft()
+    _callback_version += 1
+
+
+def callback_messages_json() -> str:
+    """Return callback_messages as JSON, re-serializing only after new appends."""
+    global _callback_json
+    if _callback_json[0] != _callback_version:
+        _callback_json = (_callback_version, orjson.dumps(list(callback_messages)).decode())
+    return _callback_json[1]
+
+
+__all__ = [
+    "STREAM_END",
+    "add_callback_message",
+    "callback_messages",
+    "callback_messages_json",
+    "deliver_pending",
+    "get_store",
+    "pending_responses",
+    "set_callback_history_size",
+]
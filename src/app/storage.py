@@ -2,11 +2,63 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
+
+import orjson
+
+# Walks idx_sessions_updated and stops at LIMIT; message_count is maintained on write, not counted here.
+_LIST_SESSIONS_SQL = """
+    SELECT session_id, created_at, updated_at, message_count
+    FROM sessions
+    ORDER BY updated_at DESC
+    LIMIT ?
+"""
+# Expired messages per session, so the sweep can adjust just those sessions' counters.
+_COUNT_EXPIRED_MESSAGES_SQL = """
+    SELECT session_id, COUNT(*)
+    FROM messages
+    WHERE created_at < ?
+    GROUP BY session_id
+"""
+_RECOUNT_MESSAGES_SQL = """
+    UPDATE sessions
+    SET message_count = (SELECT COUNT(*) FROM messages m WHERE m.session_id = sessions.session_id)
+"""
+
+# Statement text is reused verbatim so sqlite3's per-connection statement cache can skip re-parsing.
+_UPSERT_SESSION_SQL = """
+    INSERT INTO sessions(session_id, message_count) VALUES (?, ?)
+    ON CONFLICT(session_id) DO UPDATE SET
+        updated_at=CURRENT_TIMESTAMP,
+        message_count=message_count + excluded.message_count
+"""
+_INSERT_MESSAGE_SQL = """
+    INSERT INTO messages (session_id, role, content, metadata)
+    VALUES (?, ?, ?, ?)
+"""
+_MESSAGE_COLUMNS = "id, session_id, role, content, metadata, created_at"
+_GET_MESSAGES_SQL = (
+    "SELECT " + _MESSAGE_COLUMNS + " "
+    "FROM messages WHERE session_id=? ORDER BY created_at ASC, id ASC"
+)
+# Newest-first scans walk idx_messages_session_created backwards and stop at LIMIT, so the cost
+# follows the page size rather than the session length; a LIMIT of -1 means no limit in SQLite.
+_GET_RECENT_MESSAGES_SQL = (
+    "SELECT " + _MESSAGE_COLUMNS + " "
+    "FROM messages WHERE session_id=? ORDER BY created_at DESC, id DESC LIMIT ?"
+)
+_GET_MESSAGES_BEFORE_SQL = (
+    "SELECT " + _MESSAGE_COLUMNS + " "
+    "FROM messages WHERE session_id=? AND (created_at, id) < (?, ?) "
+    "ORDER BY created_at DESC, id DESC LIMIT ?"
+)
 
 
 @dataclass
@@ -18,33 +70,109 @@ class ConversationMessage:
     content: str
     metadata: dict | None
     created_at: str
+    id: int | None = None
+
+    @property
+    def cursor(self) -> str | None:
+        """Opaque keyset position; pass it back to ``get_messages`` to page to older messages."""
+        if self.id is None:
+            return None
+        return f"{self.created_at}|{self.id}"
+
+
+def _dump_metadata(metadata: dict) -> str:
+    # Stored as TEXT so existing rows and external readers keep working; non-string keys are
+    # stringified as the stdlib encoder did.
+    return orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    created_at, sep, message_id = cursor.rpartition("|")
+    if not sep or not message_id.isdigit():
+        raise ValueError(f"Invalid message cursor '{cursor}'.")
+    return created_at, int(message_id)
 
 
 class ConversationStore:
     """Persist chat transcripts keyed by session_id."""
 
-    def __init__(self, db_path: str | Path) -> None:
+    # Distinct list_sessions limits kept in the cache before it is reset.
+    _SESSIONS_CACHE_MAX_ENTRIES = 32
+
+    def __init__(self, db_path: str | Path, *, session_cache_ttl: float = 0.0) -> None:
         self.path = Path(db_path)
         if not self.path.parent.exists():
             self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.session_cache_ttl = session_cache_ttl
+        # limit -> (expires_at, rows); cleared on every write so it never outlives a change made here.
+        # Writers bump the generation after committing, and a read only fills the cache if no write
+        # finished while it ran, so rows read before a commit are never cached after it.
+        self._sessions_cache: dict[int, tuple[float, list[dict]]] = {}
+        self._sessions_generation = 0
+        self._sessions_cache_lock = threading.Lock()
+        # One long-lived connection serves every write; callers run on worker threads, so the lock
+        # serializes access to it.
+        self._lock = threading.Lock()
+        self._conn = self._connect()
         self._init_db()
+        # Reads go through a separate read-only connection so they never queue behind a write;
+        # under WAL they see the last committed state while a write is in progress.
+        self._read_lock = threading.Lock()
+        self._reader = self._connect(read_only=True)
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.path)
+    def _connect(self, *, read_only: bool = False) -> sqlite3.Connection:
+        if read_only:
+            uri = f"{self.path.resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute("PRAGMA query_only=ON")
+        else:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        # Under WAL, NORMAL only syncs at checkpoints, not on every commit, and stays crash-safe.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Enforce ON DELETE CASCADE so deleting a session also removes its messages.
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
         return conn
 
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Use the shared connection exclusively, committing on success and rolling back on error."""
+        with self._lock, self._conn:
+            yield self._conn
+
+    def _invalidate_sessions_cache(self) -> None:
+        """Drop cached session lists; call after a write has committed."""
+        with self._sessions_cache_lock:
+            self._sessions_generation += 1
+            self._sessions_cache.clear()
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        """Use the shared read-only connection exclusively."""
+        with self._read_lock:
+            yield self._reader
+
     def _init_db(self) -> None:
-        with self._connect() as conn:
+        with self._transaction() as conn:
+            # WAL lets readers proceed while a write is in progress; the mode persists in the file.
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS sessions (
                     session_id TEXT PRIMARY KEY,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    message_count INTEGER NOT NULL DEFAULT 0
                 )
                 """
             )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(sessions)")}
+            # Databases created before the counter existed get the column and a one-time backfill.
+            migrate_counts = "message_count" not in columns
+            if migrate_counts:
+                conn.execute("ALTER TABLE sessions ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS messages (
@@ -64,6 +192,14 @@ class ConversationStore:
                 ON messages(session_id, created_at)
                 """
             )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_sessions_updated
+                ON sessions(updated_at DESC)
+                """
+            )
+            if migrate_counts:
+                conn.execute(_RECOUNT_MESSAGES_SQL)
 
     def record_message(
         self,
@@ -73,50 +209,64 @@ class ConversationStore:
         metadata: dict | None = None,
     ) -> None:
         """Store a single message for a session."""
-        metadata_json = json.dumps(metadata, ensure_ascii=False) if metadata else None
-        with self._connect() as conn:
-            conn.execute(
-                """
-                INSERT INTO sessions(session_id) VALUES (?)
-                ON CONFLICT(session_id) DO NOTHING
-                """,
-                (session_id,),
-            )
-            conn.execute(
-                """
-                INSERT INTO messages (session_id, role, content, metadata)
-                VALUES (?, ?, ?, ?)
-                """,
-                (session_id, role, content, metadata_json),
-            )
-            conn.execute(
-                "UPDATE sessions SET updated_at=CURRENT_TIMESTAMP WHERE session_id=?",
-                (session_id,),
-            )
+        metadata_json = _dump_metadata(metadata) if metadata else None
+        with self._transaction() as conn:
+            # Creating the session, bumping updated_at and counting the message is a single upsert.
+            conn.execute(_UPSERT_SESSION_SQL, (session_id, 1))
+            conn.execute(_INSERT_MESSAGE_SQL, (session_id, role, content, metadata_json))
+        self._invalidate_sessions_cache()
 
-    def get_messages(self, session_id: str, limit: int | None = None) -> list[ConversationMessage]:
-        """Fetch ordered messages for a session."""
-        query = (
-            "SELECT session_id, role, content, metadata, created_at "
-            "FROM messages WHERE session_id=? ORDER BY created_at ASC, id ASC"
-        )
-        params: tuple[object, ...]
-        params = (session_id,)
-        if limit is not None:
-            query = (
-                "SELECT session_id, role, content, metadata, created_at FROM ("
-                + query
-                + ") ORDER BY created_at DESC LIMIT ?"
-            )
-            query = "SELECT * FROM (" + query + ") ORDER BY created_at ASC"
+    def record_messages(
+        self,
+        session_id: str,
+        messages: Iterable[tuple[str, str, dict | None]],
+    ) -> int:
+        """Store several ``(role, content, metadata)`` messages for a session in one transaction.
+
+        Returns the number of messages written.
+        """
+        rows = [
+            (session_id, role, content, _dump_metadata(metadata) if metadata else None)
+            for role, content, metadata in messages
+        ]
+        if not rows:
+            return 0
+        with self._transaction() as conn:
+            conn.execute(_UPSERT_SESSION_SQL, (session_id, len(rows)))
+            conn.executemany(_INSERT_MESSAGE_SQL, rows)
+        self._invalidate_sessions_cache()
+        return len(rows)
+
+    def get_messages(
+        self,
+        session_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> list[ConversationMessage]:
+        """Fetch ordered messages for a session.
+
+        ``limit`` keeps the most recent messages; ``cursor`` (a message's ``cursor``) restricts the
+        result to messages older than that one, so callers can page backwards through history.
+        """
+        if cursor is not None:
+            created_at, message_id = _decode_cursor(cursor)
+            query = _GET_MESSAGES_BEFORE_SQL
+            params: tuple[object, ...] = (session_id, created_at, message_id, -1 if limit is None else limit)
+        elif limit is not None:
+            query = _GET_RECENT_MESSAGES_SQL
             params = (session_id, limit)
+        else:
+            query = _GET_MESSAGES_SQL
+            params = (session_id,)
 
-        with self._connect() as conn:
+        with self._reading() as conn:
             rows = conn.execute(query, params).fetchall()
+        if query is not _GET_MESSAGES_SQL:
+            rows.reverse()
 
         messages: list[ConversationMessage] = []
         for row in rows:
-            metadata = json.loads(row["metadata"]) if row["metadata"] else None
+            metadata = orjson.loads(row["metadata"]) if row["metadata"] else None
             messages.append(
                 ConversationMessage(
                     session_id=row["session_id"],
@@ -124,51 +274,100 @@ class ConversationStore:
                     content=row["content"],
                     metadata=metadata,
                     created_at=row["created_at"],
+                    id=row["id"],
                 )
             )
         return messages
 
     def list_sessions(self, limit: int = 100) -> list[dict]:
-        """Summarize stored sessions."""
-        with self._connect() as conn:
-            rows = conn.execute(
-                """
-                SELECT s.session_id, s.created_at, s.updated_at, COUNT(m.id) AS message_count
-                FROM sessions s
-                LEFT JOIN messages m ON m.session_id = s.session_id
-                GROUP BY s.session_id
-                ORDER BY s.updated_at DESC
-                LIMIT ?
-                """,
-                (limit,),
-            ).fetchall()
-        return [dict(row) for row in rows]
+        """Summarize stored sessions, serving repeat calls from a short-lived cache.
+
+        Each call gets its own row dicts, so callers may modify them without touching the cache.
+        """
+        if self.session_cache_ttl > 0:
+            cached = self._sessions_cache.get(limit)
+            if cached and cached[0] > time.monotonic():
+                return [dict(session) for session in cached[1]]
+
+        generation = self._sessions_generation
+        with self._reading() as conn:
+            rows = conn.execute(_LIST_SESSIONS_SQL, (limit,)).fetchall()
+        sessions = [dict(row) for row in rows]
+
+        if self.session_cache_ttl > 0:
+            with self._sessions_cache_lock:
+                # A write committed during the read may not be reflected in these rows.
+                if generation == self._sessions_generation:
+                    if len(self._sessions_cache) >= self._SESSIONS_CACHE_MAX_ENTRIES:
+                        self._sessions_cache.clear()
+                    self._sessions_cache[limit] = (
+                        time.monotonic() + self.session_cache_ttl,
+                        [dict(session) for session in sessions],
+                    )
+        return sessions
 
     def delete_session(self, session_id: str) -> None:
         """Remove a stored conversation."""
-        with self._connect() as conn:
+        with self._transaction() as conn:
             conn.execute("DELETE FROM sessions WHERE session_id=?", (session_id,))
+        self._invalidate_sessions_cache()
 
     def delete_old_messages(self, retention_days: int) -> int:
         """Delete messages older than the specified number of days. Returns number of messages deleted."""
-        with self._connect() as conn:
-            cursor = conn.execute(
-                """
-                DELETE FROM messages
-                WHERE created_at < datetime('now', '-{} days')
-                """.format(retention_days)
-            )
-            deleted_count = cursor.rowcount
-            
-            # Clean up orphaned sessions (sessions with no messages)
-            conn.execute(
-                """
-                DELETE FROM sessions
-                WHERE session_id NOT IN (SELECT DISTINCT session_id FROM messages)
-                """
-            )
-            
-            return deleted_count
+        with self._transaction() as conn:
+            # Fix the cutoff once so the per-session counts and the delete cover the same rows.
+            cutoff = conn.execute("SELECT datetime('now', ?)", (f"-{int(retention_days)} days",)).fetchone()[0]
+            deleted = conn.execute(_COUNT_EXPIRED_MESSAGES_SQL, (cutoff,)).fetchall()
+            if deleted:
+                conn.execute("DELETE FROM messages WHERE created_at < ?", (cutoff,))
+                # Only the sessions that lost messages need their counter adjusted, and only those
+                # can have been emptied by this sweep.
+                conn.executemany(
+                    "UPDATE sessions SET message_count = message_count - ? WHERE session_id = ?",
+                    [(row[1], row[0]) for row in deleted],
+                )
+                conn.executemany(
+                    "DELETE FROM sessions WHERE session_id = ? AND message_count <= 0",
+                    [(row[0],) for row in deleted],
+                )
+            deleted_count = sum(row[1] for row in deleted)
+        self._invalidate_sessions_cache()
+
+        if deleted_count:
+            # Fold the bulk delete back into the main file so the WAL does not stay large.
+            with self._transaction() as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted_count
+
+    # Async variants for callers on the event loop; the blocking SQLite work runs in a worker thread.
+    async def arecord_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        metadata: dict | None = None,
+    ) -> None:
+        await asyncio.to_thread(self.record_message, session_id, role, content, metadata)
+
+    async def arecord_messages(self, session_id: str, messages: Iterable[tuple[str, str, dict | None]]) -> int:
+        return await asyncio.to_thread(self.record_messages, session_id, list(messages))
+
+    async def aget_messages(
+        self,
+        session_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> list[ConversationMessage]:
+        return await asyncio.to_thread(self.get_messages, session_id, limit, cursor)
+
+    async def alist_sessions(self, limit: int = 100) -> list[dict]:
+        return await asyncio.to_thread(self.list_sessions, limit)
+
+    async def adelete_session(self, session_id: str) -> None:
+        await asyncio.to_thread(self.delete_session, session_id)
+
+    async def adelete_old_messages(self, retention_days: int) -> int:
+        return await asyncio.to_thread(self.delete_old_messages, retention_days)
 
 
 def format_history_for_prompt(messages: Iterable[ConversationMessage]) -> str:
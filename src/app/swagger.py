@@ -1,92 +1,156 @@
 """Swagger UI and comprehensive OpenAPI documentation."""
 from __future__ import annotations
 
-from typing import Any
+import gzip
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from html import escape
+from types import MappingProxyType
+from typing import Any, Mapping
 
+import orjson
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, JSONResponse, Response
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from .responses import request_base_url
 
 
 def generate_openapi_schema(request: Request) -> dict[str, Any]:
-    """Generate a comprehensive OpenAPI 3.0 schema for all API and MCP routes."""
-    base_url = str(request.base_url).rstrip("/")
-    
-    return {
-        "openapi": "3.0.3",
-        "info": {
-            "title": "Internal AI MCP Bridge API",
-            "version": "1.1.0",
-            "description": (
-                "Complete API documentation for the Internal AI MCP Bridge. "
-                "This bridge exposes both standard REST API endpoints and MCP (Model Context Protocol) endpoints "
-                "for interaction with an in-house AI platform. The service supports WebSocket connections for MCP, "
-                "OpenAI-compatible chat endpoints, and memory/conversation management APIs."
-            ),
-            "contact": {
-                "name": "API Support",
-                "url": "https://github.com/AD-Archer/internal-ai-bridge-mcp"
-            }
+    """Generate a comprehensive OpenAPI 3.0 schema for all API and MCP routes.
+
+    Every section except ``servers`` is shared with other requests, so callers must not mutate it.
+    """
+    return _schema_for(request_base_url(request))
+
+
+def _schema_for(base_url: str) -> dict[str, Any]:
+    # Only the server URL varies; every other section is shared with the template.
+    schema = dict(_OPENAPI_SCHEMA_TEMPLATE)
+    schema["servers"] = [{"url": base_url, "description": "Current server"}]
+    return schema
+
+
+# MCP WebSocket endpoints that expose the memory tools; shared by the tool entries below.
+_ALL_MCP_ENDPOINTS = ("/mcp/openai", "/mcp/hook", "/mcp/memory")
+
+
+# Everything but the server URL is fixed, so the document is built once at import. The top level is
+# a read-only proxy so the shared template cannot be edited by accident; _schema_for copies it.
+# Fixed string arrays (tags, enums, required fields) are tuples, which orjson writes as arrays.
+_OPENAPI_SCHEMA_TEMPLATE: Mapping[str, Any] = MappingProxyType({
+    "openapi": "3.0.3",
+    "info": {
+        "title": "Internal AI MCP Bridge API",
+        "version": "1.1.0",
+        "description": (
+            "Complete API documentation for the Internal AI MCP Bridge. "
+            "This bridge exposes both standard REST API endpoints and MCP (Model Context Protocol) endpoints "
+            "for interaction with an in-house AI platform. The service supports WebSocket connections for MCP, "
+            "OpenAI-compatible chat endpoints, and memory/conversation management APIs."
+        ),
+        "contact": {
+            "name": "API Support",
+            "url": "https://github.com/AD-Archer/internal-ai-bridge-mcp"
+        }
+    },
+    # Filled in per request by _schema_for.
+    "servers": [],
+    "tags": [
+        {
+            "name": "Health & Status",
+            "description": "Health check and status endpoints"
         },
-        "servers": [
-            {"url": base_url, "description": "Current server"}
-        ],
-        "tags": [
-            {
-                "name": "Health & Status",
-                "description": "Health check and status endpoints"
-            },
-            {
-                "name": "OpenAI Compatible",
-                "description": "OpenAI-compatible chat completion endpoints"
-            },
-            {
-                "name": "MCP Protocol",
-                "description": "Model Context Protocol endpoints (WebSocket and HTTP)"
-            },
-            {
-                "name": "Memory & Conversations",
-                "description": "Conversation history and memory management"
-            },
-            {
-                "name": "Callbacks",
-                "description": "Callback endpoints for AI responses"
+        {
+            "name": "OpenAI Compatible",
+            "description": "OpenAI-compatible chat completion endpoints"
+        },
+        {
+            "name": "MCP Protocol",
+            "description": "Model Context Protocol endpoints (WebSocket and HTTP)"
+        },
+        {
+            "name": "Memory & Conversations",
+            "description": "Conversation history and memory management"
+        },
+        {
+            "name": "Callbacks",
+            "description": "Callback endpoints for AI responses"
+        }
+    ],
+    "paths": {
+        "/": {
+            "get": {
+                "tags": ("Health & Status",),
+                "summary": "Service information",
+                "description": "Returns basic information about the service and available endpoints",
+                "responses": {
+                    "200": {
+                        "description": "Service information",
+                        "content": {
+                            "text/plain": {
+                                "schema": {"type": "string"},
+                                "example": "Internal AI MCP Bridge WebSocket endpoints at /mcp/openai and /mcp/hook."
+                            }
+                        }
+                    }
+                }
             }
-        ],
-        "paths": {
-            "/": {
-                "get": {
-                    "tags": ["Health & Status"],
-                    "summary": "Service information",
-                    "description": "Returns basic information about the service and available endpoints",
-                    "responses": {
-                        "200": {
-                            "description": "Service information",
-                            "content": {
-                                "text/plain": {
-                                    "schema": {"type": "string"},
-                                    "example": "Internal AI MCP Bridge WebSocket endpoints at /mcp/openai and /mcp/hook."
+        },
+        "/healthz": {
+            "get": {
+                "tags": ("Health & Status",),
+                "summary": "Health check",
+                "description": "Returns the health status of the service",
+                "responses": {
+                    "200": {
+                        "description": "Service is healthy",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "status": {
+                                            "type": "string",
+                                            "example": "ok"
+                                        }
+                                    }
                                 }
                             }
                         }
                     }
                 }
-            },
-            "/healthz": {
-                "get": {
-                    "tags": ["Health & Status"],
-                    "summary": "Health check",
-                    "description": "Returns the health status of the service",
-                    "responses": {
-                        "200": {
-                            "description": "Service is healthy",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "status": {
-                                                "type": "string",
-                                                "example": "ok"
+            }
+        },
+        "/v1/models": {
+            "get": {
+                "tags": ("OpenAI Compatible",),
+                "summary": "List available models",
+                "description": "Returns a list of available AI models in OpenAI format",
+                "responses": {
+                    "200": {
+                        "description": "List of models",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "object": {
+                                            "type": "string",
+                                            "example": "list"
+                                        },
+                                        "data": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "id": {"type": "string"},
+                                                    "object": {"type": "string"},
+                                                    "created": {"type": "integer"},
+                                                    "owned_by": {"type": "string"}
+                                                }
                                             }
                                         }
                                     }
@@ -95,175 +159,236 @@ def generate_openapi_schema(request: Request) -> dict[str, Any]:
                         }
                     }
                 }
-            },
-            "/v1/models": {
-                "get": {
-                    "tags": ["OpenAI Compatible"],
-                    "summary": "List available models",
-                    "description": "Returns a list of available AI models in OpenAI format",
-                    "responses": {
-                        "200": {
-                            "description": "List of models",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "object": {
-                                                "type": "string",
-                                                "example": "list"
-                                            },
-                                            "data": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "id": {"type": "string"},
-                                                        "object": {"type": "string"},
-                                                        "created": {"type": "integer"},
-                                                        "owned_by": {"type": "string"}
-                                                    }
+            }
+        },
+        "/v1/chat/completions": {
+            "post": {
+                "tags": ("OpenAI Compatible",),
+                "summary": "Create chat completion",
+                "description": "OpenAI-compatible chat completion endpoint. Send messages and receive AI responses.",
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "required": ("messages",),
+                                "properties": {
+                                    "messages": {
+                                        "type": "array",
+                                        "description": "Array of message objects",
+                                        "items": {
+                                            "type": "object",
+                                            "required": ("role", "content"),
+                                            "properties": {
+                                                "role": {
+                                                    "type": "string",
+                                                    "enum": ("system", "user", "assistant"),
+                                                    "description": "The role of the message author"
+                                                },
+                                                "content": {
+                                                    "type": "string",
+                                                    "description": "The content of the message"
                                                 }
                                             }
                                         }
+                                    },
+                                    "stream": {
+                                        "type": "boolean",
+                                        "default": False,
+                                        "description": "Stream the reply as text/event-stream chat.completion.chunk events terminated by `data: [DONE]`"
+                                    },
+                                    "session_id": {
+                                        "type": "string",
+                                        "description": "Optional session ID for conversation tracking"
                                     }
                                 }
+                            },
+                            "example": {
+                                "messages": [
+                                    {"role": "user", "content": "Hello, how are you?"}
+                                ]
                             }
                         }
                     }
-                }
-            },
-            "/v1/chat/completions": {
-                "post": {
-                    "tags": ["OpenAI Compatible"],
-                    "summary": "Create chat completion",
-                    "description": "OpenAI-compatible chat completion endpoint. Send messages and receive AI responses.",
-                    "requestBody": {
-                        "required": True,
+                },
+                "responses": {
+                    "200": {
+                        "description": "Successful response",
                         "content": {
                             "application/json": {
                                 "schema": {
                                     "type": "object",
-                                    "required": ["messages"],
                                     "properties": {
-                                        "messages": {
+                                        "id": {"type": "string"},
+                                        "object": {"type": "string"},
+                                        "created": {"type": "integer"},
+                                        "model": {"type": "string"},
+                                        "choices": {
                                             "type": "array",
-                                            "description": "Array of message objects",
                                             "items": {
                                                 "type": "object",
-                                                "required": ["role", "content"],
                                                 "properties": {
-                                                    "role": {
-                                                        "type": "string",
-                                                        "enum": ["system", "user", "assistant"],
-                                                        "description": "The role of the message author"
+                                                    "index": {"type": "integer"},
+                                                    "message": {
+                                                        "type": "object",
+                                                        "properties": {
+                                                            "role": {"type": "string"},
+                                                            "content": {"type": "string"}
+                                                        }
                                                     },
-                                                    "content": {
-                                                        "type": "string",
-                                                        "description": "The content of the message"
-                                                    }
+                                                    "finish_reason": {"type": "string"}
                                                 }
                                             }
                                         },
-                                        "stream": {
-                                            "type": "boolean",
-                                            "default": False,
-                                            "description": "Whether to stream the response"
-                                        },
-                                        "session_id": {
-                                            "type": "string",
-                                            "description": "Optional session ID for conversation tracking"
+                                        "usage": {
+                                            "type": "object",
+                                            "properties": {
+                                                "prompt_tokens": {"type": "integer"},
+                                                "completion_tokens": {"type": "integer"},
+                                                "total_tokens": {"type": "integer"}
+                                            }
                                         }
                                     }
-                                },
-                                "example": {
-                                    "messages": [
-                                        {"role": "user", "content": "Hello, how are you?"}
-                                    ]
                                 }
                             }
                         }
                     },
-                    "responses": {
-                        "200": {
-                            "description": "Successful response",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "id": {"type": "string"},
-                                            "object": {"type": "string"},
-                                            "created": {"type": "integer"},
-                                            "model": {"type": "string"},
-                                            "choices": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "index": {"type": "integer"},
-                                                        "message": {
-                                                            "type": "object",
-                                                            "properties": {
-                                                                "role": {"type": "string"},
-                                                                "content": {"type": "string"}
-                                                            }
-                                                        },
-                                                        "finish_reason": {"type": "string"}
-                                                    }
-                                                }
-                                            },
-                                            "usage": {
-                                                "type": "object",
-                                                "properties": {
-                                                    "prompt_tokens": {"type": "integer"},
-                                                    "completion_tokens": {"type": "integer"},
-                                                    "total_tokens": {"type": "integer"}
-                                                }
+                    "400": {
+                        "description": "Bad request",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ErrorResponse"}
+                            }
+                        }
+                    },
+                    "500": {
+                        "description": "Internal server error",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ErrorResponse"}
+                            }
+                        }
+                    },
+                    "504": {
+                        "description": "Gateway timeout",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "error": {
+                                            "type": "object",
+                                            "properties": {
+                                                "message": {"type": "string"},
+                                                "type": {"type": "string"}
                                             }
                                         }
                                     }
                                 }
                             }
-                        },
-                        "400": {
-                            "description": "Bad request",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
+                        }
+                    }
+                }
+            }
+        },
+        "/callback": {
+            "post": {
+                "tags": ("Callbacks",),
+                "summary": "AI callback endpoint",
+                "description": "Endpoint for AI service to send follow-up messages and responses back to the bridge",
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "session_id": {
+                                        "type": "string",
+                                        "description": "Session identifier"
+                                    },
+                                    "message": {
+                                        "type": "string",
+                                        "description": "The AI response message"
+                                    },
+                                    "status": {
+                                        "type": "string",
+                                        "enum": ("info", "success", "error", "complete"),
+                                        "description": "Status of the response"
+                                    },
+                                    "payload": {
                                         "type": "object",
-                                        "properties": {
-                                            "error": {"type": "string"}
-                                        }
+                                        "description": "Additional payload data"
                                     }
                                 }
                             }
-                        },
-                        "500": {
-                            "description": "Internal server error",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "error": {"type": "string"}
-                                        }
+                        }
+                    }
+                },
+                "responses": {
+                    "200": {
+                        "description": "Callback received successfully",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "status": {"type": "string"},
+                                        "session_id": {"type": "string"}
                                     }
                                 }
                             }
-                        },
-                        "504": {
-                            "description": "Gateway timeout",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "error": {
+                        }
+                    },
+                    "400": {
+                        "description": "Invalid request",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ErrorResponse"}
+                            }
+                        }
+                    },
+                    "500": {
+                        "description": "Internal server error",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ErrorResponse"}
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        "/conversations": {
+            "get": {
+                "tags": ("Memory & Conversations",),
+                "summary": "List conversations",
+                "description": "Get a list of recent conversation sessions",
+                "parameters": [
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "schema": {"type": "integer", "default": 100},
+                        "description": "Maximum number of sessions to return"
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "List of conversation sessions",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "sessions": {
+                                            "type": "array",
+                                            "items": {
                                                 "type": "object",
                                                 "properties": {
-                                                    "message": {"type": "string"},
-                                                    "type": {"type": "string"}
+                                                    "session_id": {"type": "string"},
+                                                    "message_count": {"type": "integer"},
+                                                    "last_updated": {"type": "string"}
                                                 }
                                             }
                                         }
@@ -273,204 +398,136 @@ def generate_openapi_schema(request: Request) -> dict[str, Any]:
                         }
                     }
                 }
-            },
-            "/callback": {
-                "post": {
-                    "tags": ["Callbacks"],
-                    "summary": "AI callback endpoint",
-                    "description": "Endpoint for AI service to send follow-up messages and responses back to the bridge",
-                    "requestBody": {
+            }
+        },
+        "/conversations/{session_id}": {
+            "get": {
+                "tags": ("Memory & Conversations",),
+                "summary": "Get conversation details",
+                "description": "Retrieve all messages for a specific conversation session",
+                "parameters": [
+                    {
+                        "name": "session_id",
+                        "in": "path",
                         "required": True,
+                        "schema": {"type": "string"},
+                        "description": "The session ID to retrieve"
+                    },
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer"},
+                        "description": "Return only the most recent N messages"
+                    },
+                    {
+                        "name": "cursor",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "string"},
+                        "description": "next_cursor from a previous page; returns messages older than it"
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Conversation details",
                         "content": {
                             "application/json": {
                                 "schema": {
                                     "type": "object",
                                     "properties": {
-                                        "session_id": {
-                                            "type": "string",
-                                            "description": "Session identifier"
-                                        },
-                                        "message": {
-                                            "type": "string",
-                                            "description": "The AI response message"
-                                        },
-                                        "status": {
-                                            "type": "string",
-                                            "enum": ["info", "success", "error", "complete"],
-                                            "description": "Status of the response"
+                                        "session_id": {"type": "string"},
+                                        "messages": {
+                                            "type": "array",
+                                            "items": {"$ref": "#/components/schemas/StoredMessage"}
                                         },
-                                        "payload": {
-                                            "type": "object",
-                                            "description": "Additional payload data"
-                                        }
+                                        "next_cursor": {"type": "string", "description": "Present when limit is set; cursor for the previous page"}
                                     }
                                 }
                             }
                         }
                     },
-                    "responses": {
-                        "200": {
-                            "description": "Callback received successfully",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "status": {"type": "string"},
-                                            "session_id": {"type": "string"}
-                                        }
-                                    }
-                                }
-                            }
-                        },
-                        "400": {
-                            "description": "Invalid request",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "error": {"type": "string"}
-                                        }
-                                    }
-                                }
-                            }
-                        },
-                        "500": {
-                            "description": "Internal server error",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "error": {"type": "string"}
-                                        }
-                                    }
-                                }
+                    "404": {
+                        "description": "Session not found",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ErrorResponse"}
                             }
                         }
                     }
                 }
             },
-            "/conversations": {
-                "get": {
-                    "tags": ["Memory & Conversations"],
-                    "summary": "List conversations",
-                    "description": "Get a list of recent conversation sessions",
-                    "parameters": [
-                        {
-                            "name": "limit",
-                            "in": "query",
-                            "schema": {"type": "integer", "default": 100},
-                            "description": "Maximum number of sessions to return"
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "List of conversation sessions",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "sessions": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "session_id": {"type": "string"},
-                                                        "message_count": {"type": "integer"},
-                                                        "last_updated": {"type": "string"}
-                                                    }
-                                                }
-                                            }
-                                        }
+            "delete": {
+                "tags": ("Memory & Conversations",),
+                "summary": "Delete conversation",
+                "description": "Delete a conversation session and all its messages",
+                "parameters": [
+                    {
+                        "name": "session_id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "string"},
+                        "description": "The session ID to delete"
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Conversation deleted successfully",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "status": {"type": "string"},
+                                        "session_id": {"type": "string"}
                                     }
                                 }
                             }
                         }
                     }
                 }
-            },
-            "/conversations/{session_id}": {
-                "get": {
-                    "tags": ["Memory & Conversations"],
-                    "summary": "Get conversation details",
-                    "description": "Retrieve all messages for a specific conversation session",
-                    "parameters": [
-                        {
-                            "name": "session_id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "string"},
-                            "description": "The session ID to retrieve"
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Conversation details",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "session_id": {"type": "string"},
-                                            "messages": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "role": {"type": "string"},
-                                                        "content": {"type": "string"},
-                                                        "metadata": {"type": "object"},
-                                                        "created_at": {"type": "string"}
-                                                    }
-                                                }
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        },
-                        "404": {
-                            "description": "Session not found",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "error": {"type": "string"}
-                                        }
-                                    }
-                                }
-                            }
-                        }
+            }
+        },
+        "/memory/recall": {
+            "get": {
+                "tags": ("Memory & Conversations",),
+                "summary": "Recall conversation memory (GET)",
+                "description": "Retrieve formatted conversation context and history via GET request",
+                "parameters": [
+                    {
+                        "name": "session_id",
+                        "in": "query",
+                        "schema": {"type": "string"},
+                        "description": "Session ID to recall"
+                    },
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "schema": {"type": "integer"},
+                        "description": "Maximum number of messages to include"
                     }
-                },
-                "delete": {
-                    "tags": ["Memory & Conversations"],
-                    "summary": "Delete conversation",
-                    "description": "Delete a conversation session and all its messages",
-                    "parameters": [
-                        {
-                            "name": "session_id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "string"},
-                            "description": "The session ID to delete"
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Conversation deleted successfully",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "status": {"type": "string"},
-                                            "session_id": {"type": "string"}
-                                        }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Memory context retrieved",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "session_id": {"type": "string"},
+                                        "messages": {"type": "array"},
+                                        "context_block": {"type": "string"},
+                                        "user_messages": {
+                                            "type": "array",
+                                            "items": {"type": "string"}
+                                        },
+                                        "assistant_messages": {
+                                            "type": "array",
+                                            "items": {"type": "string"}
+                                        },
+                                        "message_count": {"type": "integer"},
+                                        "limit_applied": {"type": "integer"}
                                     }
                                 }
                             }
@@ -478,189 +535,142 @@ def generate_openapi_schema(request: Request) -> dict[str, Any]:
                     }
                 }
             },
-            "/memory/recall": {
-                "get": {
-                    "tags": ["Memory & Conversations"],
-                    "summary": "Recall conversation memory (GET)",
-                    "description": "Retrieve formatted conversation context and history via GET request",
-                    "parameters": [
-                        {
-                            "name": "session_id",
-                            "in": "query",
-                            "schema": {"type": "string"},
-                            "description": "Session ID to recall"
-                        },
-                        {
-                            "name": "limit",
-                            "in": "query",
-                            "schema": {"type": "integer"},
-                            "description": "Maximum number of messages to include"
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Memory context retrieved",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "session_id": {"type": "string"},
-                                            "messages": {"type": "array"},
-                                            "context_block": {"type": "string"},
-                                            "user_messages": {
-                                                "type": "array",
-                                                "items": {"type": "string"}
-                                            },
-                                            "assistant_messages": {
-                                                "type": "array",
-                                                "items": {"type": "string"}
-                                            },
-                                            "message_count": {"type": "integer"},
-                                            "limit_applied": {"type": "integer"}
-                                        }
+            "post": {
+                "tags": ("Memory & Conversations",),
+                "summary": "Recall conversation memory (POST)",
+                "description": "Retrieve formatted conversation context and history via POST request with optional parameters in body",
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "session_id": {
+                                        "type": "string",
+                                        "description": "Session ID to recall"
+                                    },
+                                    "limit": {
+                                        "type": "integer",
+                                        "description": "Maximum number of messages to include"
                                     }
                                 }
                             }
                         }
                     }
                 },
-                "post": {
-                    "tags": ["Memory & Conversations"],
-                    "summary": "Recall conversation memory (POST)",
-                    "description": "Retrieve formatted conversation context and history via POST request with optional parameters in body",
-                    "requestBody": {
+                "responses": {
+                    "200": {
+                        "description": "Memory context retrieved or health check",
                         "content": {
                             "application/json": {
                                 "schema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "session_id": {
-                                            "type": "string",
-                                            "description": "Session ID to recall"
+                                    "oneOf": [
+                                        {
+                                            "type": "object",
+                                            "properties": {
+                                                "status": {"type": "string"},
+                                                "requires_session_id": {"type": "boolean"},
+                                                "message": {"type": "string"}
+                                            }
                                         },
-                                        "limit": {
-                                            "type": "integer",
-                                            "description": "Maximum number of messages to include"
+                                        {
+                                            "type": "object",
+                                            "properties": {
+                                                "session_id": {"type": "string"},
+                                                "messages": {"type": "array"},
+                                                "context_block": {"type": "string"},
+                                                "message_count": {"type": "integer"}
+                                            }
                                         }
-                                    }
+                                    ]
                                 }
                             }
                         }
-                    },
-                    "responses": {
-                        "200": {
-                            "description": "Memory context retrieved or health check",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "oneOf": [
-                                            {
-                                                "type": "object",
-                                                "properties": {
-                                                    "status": {"type": "string"},
-                                                    "requires_session_id": {"type": "boolean"},
-                                                    "message": {"type": "string"}
-                                                }
-                                            },
-                                            {
-                                                "type": "object",
-                                                "properties": {
-                                                    "session_id": {"type": "string"},
-                                                    "messages": {"type": "array"},
-                                                    "context_block": {"type": "string"},
-                                                    "message_count": {"type": "integer"}
-                                                }
-                                            }
-                                        ]
-                                    }
-                                }
+                    }
+                }
+            }
+        },
+        "/mcp/openapi.json": {
+            "get": {
+                "tags": ("MCP Protocol",),
+                "summary": "MCP OpenAPI schema",
+                "description": "Returns OpenAPI schema for MCP WebSocket endpoints",
+                "responses": {
+                    "200": {
+                        "description": "OpenAPI schema",
+                        "content": {
+                            "application/json": {
+                                "schema": {"type": "object"}
                             }
                         }
                     }
                 }
-            },
-            "/mcp/openapi.json": {
-                "get": {
-                    "tags": ["MCP Protocol"],
-                    "summary": "MCP OpenAPI schema",
-                    "description": "Returns OpenAPI schema for MCP WebSocket endpoints",
-                    "responses": {
-                        "200": {
-                            "description": "OpenAPI schema",
-                            "content": {
-                                "application/json": {
-                                    "schema": {"type": "object"}
+            }
+        },
+        "/mcp/hook": {
+            "post": {
+                "tags": ("MCP Protocol",),
+                "summary": "MCP Memory HTTP endpoint",
+                "description": "HTTP endpoint for MCP protocol using JSON-RPC. Supports memory tools and conversation management.",
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "required": ("jsonrpc", "method"),
+                                "properties": {
+                                    "jsonrpc": {
+                                        "type": "string",
+                                        "enum": ("2.0",),
+                                        "description": "JSON-RPC version"
+                                    },
+                                    "method": {
+                                        "type": "string",
+                                        "enum": (
+                                            "initialize",
+                                            "tools/list",
+                                            "tools/call",
+                                            "resources/list",
+                                            "resources/read"
+                                        ),
+                                        "description": "MCP method to call"
+                                    },
+                                    "params": {
+                                        "type": "object",
+                                        "description": "Method parameters"
+                                    },
+                                    "id": {
+                                        "description": "Request identifier (omit for notifications)"
+                                    }
                                 }
+                            },
+                            "examples": {
+                                "initialize": {"$ref": "#/components/examples/McpInitialize"},
+                                "list_tools": {"$ref": "#/components/examples/McpListTools"},
+                                "call_tool": {"$ref": "#/components/examples/McpCallTool"}
                             }
                         }
                     }
-                }
-            },
-            "/mcp/hook": {
-                "post": {
-                    "tags": ["MCP Protocol"],
-                    "summary": "MCP Memory HTTP endpoint",
-                    "description": "HTTP endpoint for MCP protocol using JSON-RPC. Supports memory tools and conversation management.",
-                    "requestBody": {
-                        "required": True,
+                },
+                "responses": {
+                    "200": {
+                        "description": "JSON-RPC response",
                         "content": {
                             "application/json": {
                                 "schema": {
                                     "type": "object",
-                                    "required": ["jsonrpc", "method"],
                                     "properties": {
-                                        "jsonrpc": {
-                                            "type": "string",
-                                            "enum": ["2.0"],
-                                            "description": "JSON-RPC version"
-                                        },
-                                        "method": {
-                                            "type": "string",
-                                            "enum": [
-                                                "initialize",
-                                                "tools/list",
-                                                "tools/call",
-                                                "resources/list",
-                                                "resources/read"
-                                            ],
-                                            "description": "MCP method to call"
+                                        "jsonrpc": {"type": "string"},
+                                        "id": {},
+                                        "result": {
+                                            "description": "Method result"
                                         },
-                                        "params": {
+                                        "error": {
                                             "type": "object",
-                                            "description": "Method parameters"
-                                        },
-                                        "id": {
-                                            "description": "Request identifier (omit for notifications)"
-                                        }
-                                    }
-                                },
-                                "examples": {
-                                    "initialize": {
-                                        "summary": "Initialize MCP connection",
-                                        "value": {
-                                            "jsonrpc": "2.0",
-                                            "id": "1",
-                                            "method": "initialize"
-                                        }
-                                    },
-                                    "list_tools": {
-                                        "summary": "List available tools",
-                                        "value": {
-                                            "jsonrpc": "2.0",
-                                            "id": "2",
-                                            "method": "tools/list"
-                                        }
-                                    },
-                                    "call_tool": {
-                                        "summary": "Call a tool",
-                                        "value": {
-                                            "jsonrpc": "2.0",
-                                            "id": "3",
-                                            "method": "tools/call",
-                                            "params": {
-                                                "name": "list_conversations",
-                                                "arguments": {"limit": 10}
+                                            "properties": {
+                                                "code": {"type": "integer"},
+                                                "message": {"type": "string"}
                                             }
                                         }
                                     }
@@ -668,128 +678,246 @@ def generate_openapi_schema(request: Request) -> dict[str, Any]:
                             }
                         }
                     },
-                    "responses": {
-                        "200": {
-                            "description": "JSON-RPC response",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "jsonrpc": {"type": "string"},
-                                            "id": {},
-                                            "result": {
-                                                "description": "Method result"
-                                            },
-                                            "error": {
-                                                "type": "object",
-                                                "properties": {
-                                                    "code": {"type": "integer"},
-                                                    "message": {"type": "string"}
-                                                }
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        },
-                        "204": {
-                            "description": "Notification received (no response body)"
-                        },
-                        "400": {
-                            "description": "Invalid request"
-                        },
-                        "404": {
-                            "description": "Method not found"
-                        },
-                        "405": {
-                            "description": "Method not allowed"
-                        }
-                    }
-                }
-            },
-            "/mcp/memory": {
-                "post": {
-                    "tags": ["MCP Protocol"],
-                    "summary": "MCP Memory HTTP endpoint (alias)",
-                    "description": "Alternative HTTP endpoint for MCP memory protocol (same as /mcp/hook)",
-                    "requestBody": {
-                        "$ref": "#/paths/~1mcp~1hook/post/requestBody"
+                    "204": {
+                        "description": "Notification received (no response body)"
                     },
-                    "responses": {
-                        "$ref": "#/paths/~1mcp~1hook/post/responses"
+                    "400": {
+                        "description": "Invalid request"
+                    },
+                    "404": {
+                        "description": "Method not found"
+                    },
+                    "405": {
+                        "description": "Method not allowed"
                     }
                 }
             }
         },
-        "components": {
-            "schemas": {},
-            "securitySchemes": {
-                "BearerAuth": {
-                    "type": "http",
-                    "scheme": "bearer",
-                    "description": "Optional Bearer token authentication (when ENABLE_BEARER_AUTH=true)"
+        "/mcp/memory": {
+            "post": {
+                "tags": ("MCP Protocol",),
+                "summary": "MCP Memory HTTP endpoint (alias)",
+                "description": "Alternative HTTP endpoint for MCP memory protocol (same as /mcp/hook)",
+                "requestBody": {
+                    "$ref": "#/paths/~1mcp~1hook/post/requestBody"
+                },
+                "responses": {
+                    "$ref": "#/paths/~1mcp~1hook/post/responses"
+                }
+            }
+        }
+    },
+    "components": {
+        # Shapes and examples shared by several operations are defined once and referenced with $ref.
+        "schemas": {
+            "ErrorResponse": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            },
+            "StoredMessage": {
+                "type": "object",
+                "properties": {
+                    "role": {"type": "string"},
+                    "content": {"type": "string"},
+                    "metadata": {"type": "object"},
+                    "created_at": {"type": "string"}
                 }
             }
         },
-        "x-mcp-websockets": {
-            "description": "The following WebSocket endpoints are available for MCP protocol connections",
-            "endpoints": [
-                {
-                    "path": "/mcp/openai",
-                    "description": "Primary MCP WebSocket endpoint with full AI and memory capabilities",
-                    "protocol": "MCP"
-                },
-                {
-                    "path": "/mcp/hook",
-                    "description": "Memory-focused MCP WebSocket endpoint",
-                    "protocol": "MCP"
-                },
-                {
-                    "path": "/mcp/memory",
-                    "description": "Memory MCP WebSocket endpoint (alias of /mcp/hook)",
-                    "protocol": "MCP"
+        "examples": {
+            "McpInitialize": {
+                "summary": "Initialize MCP connection",
+                "value": {
+                    "jsonrpc": "2.0",
+                    "id": "1",
+                    "method": "initialize"
                 }
-            ],
-            "tools": [
-                {
-                    "name": "start_ai_message",
-                    "description": "Send a prompt to the AI service",
-                    "available_on": ["/mcp/openai"]
-                },
-                {
-                    "name": "list_conversations",
-                    "description": "List recent conversation sessions",
-                    "available_on": ["/mcp/openai", "/mcp/hook", "/mcp/memory"]
-                },
-                {
-                    "name": "get_conversation",
-                    "description": "Get messages for a specific session",
-                    "available_on": ["/mcp/openai", "/mcp/hook", "/mcp/memory"]
-                },
-                {
-                    "name": "recall_conversation_context",
-                    "description": "Get formatted context block for a session",
-                    "available_on": ["/mcp/openai", "/mcp/hook", "/mcp/memory"]
-                },
-                {
-                    "name": "delete_conversation",
-                    "description": "Delete a conversation session",
-                    "available_on": ["/mcp/openai", "/mcp/hook", "/mcp/memory"]
-                },
-                {
-                    "name": "send_user_response",
-                    "description": "Send response back to user/OpenWebUI",
-                    "available_on": ["/mcp/openai", "/mcp/hook", "/mcp/memory"]
+            },
+            "McpListTools": {
+                "summary": "List available tools",
+                "value": {
+                    "jsonrpc": "2.0",
+                    "id": "2",
+                    "method": "tools/list"
                 }
-            ]
+            },
+            "McpCallTool": {
+                "summary": "Call a tool",
+                "value": {
+                    "jsonrpc": "2.0",
+                    "id": "3",
+                    "method": "tools/call",
+                    "params": {
+                        "name": "list_conversations",
+                        "arguments": {"limit": 10}
+                    }
+                }
+            }
+        },
+        "securitySchemes": {
+            "BearerAuth": {
+                "type": "http",
+                "scheme": "bearer",
+                "description": "Optional Bearer token authentication (when ENABLE_BEARER_AUTH=true)"
+            }
         }
+    },
+    "x-mcp-websockets": {
+        "description": "The following WebSocket endpoints are available for MCP protocol connections",
+        "endpoints": [
+            {
+                "path": "/mcp/openai",
+                "description": "Primary MCP WebSocket endpoint with full AI and memory capabilities",
+                "protocol": "MCP"
+            },
+            {
+                "path": "/mcp/hook",
+                "description": "Memory-focused MCP WebSocket endpoint",
+                "protocol": "MCP"
+            },
+            {
+                "path": "/mcp/memory",
+                "description": "Memory MCP WebSocket endpoint (alias of /mcp/hook)",
+                "protocol": "MCP"
+            }
+        ],
+        "tools": [
+            {
+                "name": "start_ai_message",
+                "description": "Send a prompt to the AI service",
+                "available_on": ("/mcp/openai",)
+            },
+            {
+                "name": "list_conversations",
+                "description": "List recent conversation sessions",
+                "available_on": _ALL_MCP_ENDPOINTS
+            },
+            {
+                "name": "get_conversation",
+                "description": "Get messages for a specific session",
+                "available_on": _ALL_MCP_ENDPOINTS
+            },
+            {
+                "name": "recall_conversation_context",
+                "description": "Get formatted context block for a session",
+                "available_on": _ALL_MCP_ENDPOINTS
+            },
+            {
+                "name": "delete_conversation",
+                "description": "Delete a conversation session",
+                "available_on": _ALL_MCP_ENDPOINTS
+            },
+            {
+                "name": "send_user_response",
+                "description": "Send response back to user/OpenWebUI",
+                "available_on": _ALL_MCP_ENDPOINTS
+            }
+        ]
     }
+})
 
 
-def generate_swagger_html() -> str:
-    """Generate API documentation HTML page."""
-    return """<!DOCTYPE html>
+_BASE_URL_PLACEHOLDER = "__BASE_URL__"
+# Serialized once; requests only splice their base URL into the bytes.
+_OPENAPI_BYTES_TEMPLATE = orjson.dumps(_schema_for(_BASE_URL_PLACEHOLDER))
+
+
+def generate_openapi_bytes(request: Request) -> bytes:
+    """Return the OpenAPI schema as JSON bytes for the request's base URL."""
+    return _render_openapi(request_base_url(request))
+
+
+def _render_openapi(base_url: str) -> bytes:
+    # Encode as a JSON string and drop the quotes so the URL is escaped like any other value.
+    return _OPENAPI_BYTES_TEMPLATE.replace(_BASE_URL_PLACEHOLDER.encode(), orjson.dumps(base_url)[1:-1])
+
+
+def _gzipped_openapi(base_url: str) -> bytes:
+    # The repetitive schema shrinks to a fraction of its size.
+    return gzip.compress(_render_openapi(base_url), compresslevel=9)
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() != "gzip":
+            continue
+        quality = params.strip().removeprefix("q=")
+        try:
+            return not quality or float(quality) > 0
+        except ValueError:
+            return True
+    return False
+
+
+# The docs only change between deployments, so clients may reuse them for five minutes and then
+# keep showing the stale copy for up to an hour while they revalidate in the background.
+_DOCS_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=3600"
+# Both bodies are fixed for the life of the process, so its start time stands in for their mtime.
+_DOCS_LAST_MODIFIED_AT = int(time.time())
+_DOCS_LAST_MODIFIED = formatdate(_DOCS_LAST_MODIFIED_AT, usegmt=True)
+_OPENAPI_TEMPLATE_DIGEST = hashlib.sha256(_OPENAPI_BYTES_TEMPLATE)
+
+
+@lru_cache(maxsize=64)
+def _openapi_etag(base_url: str, gzipped: bool = False) -> str:
+    # The body is fully determined by the template and the base URL, so hash those instead of the body.
+    # Each encoding is a distinct representation and gets its own tag.
+    digest = _OPENAPI_TEMPLATE_DIGEST.copy()
+    digest.update(base_url.encode())
+    suffix = "-gzip" if gzipped else ""
+    return f'"{digest.hexdigest()[:32]}{suffix}"'
+
+
+class _ReusableResponse(Response):
+    """A response built once and sent to many requests.
+
+    Middleware such as CORSMiddleware edits the start message's header list in place, so every
+    send gets its own copy instead of the shared ``raw_headers``.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": list(self.raw_headers)})
+        await send({"type": "http.response.body", "body": self.body})
+
+
+@lru_cache(maxsize=64)
+def _openapi_response(base_url: str, gzipped: bool, not_modified: bool) -> Response:
+    """Build the /openapi.json reply for one base URL and encoding once, then reuse it."""
+    headers = {
+        "ETag": _openapi_etag(base_url, gzipped),
+        "Cache-Control": _DOCS_CACHE_CONTROL,
+        "Last-Modified": _DOCS_LAST_MODIFIED,
+        "Vary": "Accept-Encoding",
+    }
+    if not_modified:
+        return _ReusableResponse(status_code=304, headers=headers)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return _ReusableResponse(_gzipped_openapi(base_url), media_type="application/json", headers=headers)
+    return _ReusableResponse(_render_openapi(base_url), media_type="application/json", headers=headers)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's cached copy is current, so a bodyless 304 can be sent."""
+    header = request.headers.get("if-none-match")
+    if header:
+        tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return etag in tags or "*" in tags
+    # If-Modified-Since only counts when no entity tag was sent.
+    since = request.headers.get("if-modified-since")
+    if not since:
+        return False
+    try:
+        return parsedate_to_datetime(since).timestamp() >= _DOCS_LAST_MODIFIED_AT
+    except (TypeError, ValueError):
+        return False
+
+
+# Static parts of the docs page; the endpoint sections between them are generated from the schema.
+_SWAGGER_HTML_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -927,177 +1055,118 @@ def generate_swagger_html() -> str:
             </div>
         </div>
 
-        <div class="section">
-            <h2>🏥 Health & Status</h2>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method get">GET</span>
-                    <span class="path">/healthz</span>
-                </div>
-                <p class="description">Health check endpoint - returns service status</p>
-            </div>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method get">GET</span>
-                    <span class="path">/</span>
-                </div>
-                <p class="description">Service information and available endpoints</p>
+"""
+_SWAGGER_HTML_TAIL = """        <div class="section">
+            <h2>🔐 Authentication</h2>
+            <div class="info-box">
+                <p><strong>Bearer Token Authentication</strong> can be enabled via the <code>ENABLE_BEARER_AUTH</code> environment variable.</p>
+                <p style="margin-top: 0.5rem;">When enabled, most routes require an <code>Authorization: Bearer &lt;token&gt;</code> header.</p>
+                <p style="margin-top: 0.5rem;"><strong>Exempt routes:</strong> <code>/healthz</code>, <code>/docs</code>, <code>/openapi.json</code></p>
             </div>
         </div>
+    </div>
+</body>
+</html>
+"""
 
-        <div class="section">
-            <h2>🤖 OpenAI Compatible API</h2>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method get">GET</span>
-                    <span class="path">/v1/models</span>
-                </div>
-                <p class="description">List available AI models in OpenAI format</p>
-            </div>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method post">POST</span>
-                    <span class="path">/v1/chat/completions</span>
-                </div>
-                <p class="description">Create chat completions (OpenAI-compatible endpoint)</p>
-            </div>
-        </div>
+_TAG_ICONS = {
+    "Health & Status": "🏥",
+    "OpenAI Compatible": "🤖",
+    "MCP Protocol": "🔌",
+    "Memory & Conversations": "💾",
+    "Callbacks": "📞",
+}
+_MCP_TAG = "MCP Protocol"
 
-        <div class="section">
-            <h2>🔌 MCP Protocol Endpoints</h2>
-            <div class="info-box">
-                <strong>Model Context Protocol (MCP)</strong> endpoints support both WebSocket and HTTP JSON-RPC connections.
-            </div>
-            
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method ws">WS</span>
-                    <span class="path">/mcp/openai</span>
-                </div>
-                <p class="description">Primary MCP WebSocket endpoint with full AI and memory capabilities</p>
-            </div>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method ws">WS</span>
-                    <span class="path">/mcp/hook</span>
-                </div>
-                <p class="description">Memory-focused MCP WebSocket endpoint</p>
-            </div>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method post">POST</span>
-                    <span class="path">/mcp/hook</span>
-                </div>
-                <p class="description">HTTP endpoint for MCP protocol using JSON-RPC (memory tools)</p>
-            </div>
-            <div class="endpoint">
+
+def _endpoint_html(method: str, path: str, description: str) -> str:
+    return f"""            <div class="endpoint">
                 <div class="endpoint-header">
-                    <span class="method post">POST</span>
-                    <span class="path">/mcp/memory</span>
+                    <span class="method {method}">{method.upper()}</span>
+                    <span class="path">{escape(path)}</span>
                 </div>
-                <p class="description">Alternative HTTP endpoint for MCP memory protocol</p>
+                <p class="description">{escape(description)}</p>
             </div>
+"""
 
-            <h3 style="margin-top: 2rem; color: #667eea;">Available MCP Tools</h3>
-            <div class="mcp-tools">
-                <div class="tool-card">
-                    <h4>list_conversations</h4>
-                    <p>List recent conversation sessions from memory</p>
-                </div>
-                <div class="tool-card">
-                    <h4>get_conversation</h4>
-                    <p>Get all messages for a specific session</p>
-                </div>
-                <div class="tool-card">
-                    <h4>recall_conversation_context</h4>
-                    <p>Get formatted context block for a session</p>
-                </div>
-                <div class="tool-card">
-                    <h4>delete_conversation</h4>
-                    <p>Delete a conversation session and its messages</p>
-                </div>
-                <div class="tool-card">
-                    <h4>send_user_response</h4>
-                    <p>Send response back to user/OpenWebUI</p>
-                </div>
-                <div class="tool-card">
-                    <h4>start_ai_message</h4>
-                    <p>Send a prompt to the AI service (main endpoint only)</p>
-                </div>
-            </div>
-        </div>
 
-        <div class="section">
-            <h2>💾 Memory & Conversations</h2>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method get">GET</span>
-                    <span class="path">/conversations</span>
+def _tool_card_html(tool: Mapping[str, Any]) -> str:
+    description = tool["description"]
+    if tool["available_on"] != _ALL_MCP_ENDPOINTS:
+        description += f" (only on {', '.join(tool['available_on'])})"
+    return f"""                <div class="tool-card">
+                    <h4>{escape(tool["name"])}</h4>
+                    <p>{escape(description)}</p>
                 </div>
-                <p class="description">List all conversation sessions with metadata</p>
-            </div>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method get">GET</span>
-                    <span class="path">/conversations/{session_id}</span>
-                </div>
-                <p class="description">Retrieve all messages for a specific session</p>
-            </div>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method delete">DELETE</span>
-                    <span class="path">/conversations/{session_id}</span>
-                </div>
-                <p class="description">Delete a conversation session</p>
-            </div>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method get">GET</span>
-                    <span class="path">/memory/recall</span>
-                </div>
-                <p class="description">Recall conversation memory with formatted context</p>
-            </div>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method post">POST</span>
-                    <span class="path">/memory/recall</span>
-                </div>
-                <p class="description">Recall conversation memory via POST request</p>
-            </div>
-        </div>
+"""
 
-        <div class="section">
-            <h2>📞 Callbacks</h2>
-            <div class="endpoint">
-                <div class="endpoint-header">
-                    <span class="method post">POST</span>
-                    <span class="path">/callback</span>
-                </div>
-                <p class="description">Endpoint for AI service to send follow-up messages and responses</p>
-            </div>
-        </div>
 
-        <div class="section">
-            <h2>🔐 Authentication</h2>
-            <div class="info-box">
-                <p><strong>Bearer Token Authentication</strong> can be enabled via the <code>ENABLE_BEARER_AUTH</code> environment variable.</p>
-                <p style="margin-top: 0.5rem;">When enabled, most routes require an <code>Authorization: Bearer &lt;token&gt;</code> header.</p>
-                <p style="margin-top: 0.5rem;"><strong>Exempt routes:</strong> <code>/healthz</code>, <code>/docs</code>, <code>/openapi.json</code></p>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-"""
+def generate_swagger_html() -> str:
+    """Generate API documentation HTML page from the OpenAPI template, so the two cannot drift."""
+    schema = _OPENAPI_SCHEMA_TEMPLATE
+    websockets = schema["x-mcp-websockets"]
+    endpoints: dict[str, list[str]] = {tag["name"]: [] for tag in schema["tags"]}
+    for path, operations in schema["paths"].items():
+        for method, operation in operations.items():
+            endpoints[operation["tags"][0]].append(_endpoint_html(method, path, operation["description"]))
+
+    parts = [_SWAGGER_HTML_HEAD]
+    for name, section in endpoints.items():
+        parts.append(f'        <div class="section">\n            <h2>{_TAG_ICONS.get(name, "")} {escape(name)}</h2>\n')
+        if name == _MCP_TAG:
+            parts.append(
+                '            <div class="info-box">\n'
+                "                <strong>Model Context Protocol (MCP)</strong> endpoints support both WebSocket "
+                "and HTTP JSON-RPC connections.\n"
+                "            </div>\n"
+            )
+            parts.extend(_endpoint_html("ws", ws["path"], ws["description"]) for ws in websockets["endpoints"])
+        parts.extend(section)
+        if name == _MCP_TAG:
+            parts.append('\n            <h3 style="margin-top: 2rem; color: #667eea;">Available MCP Tools</h3>\n')
+            parts.append('            <div class="mcp-tools">\n')
+            parts.extend(_tool_card_html(tool) for tool in websockets["tools"])
+            parts.append("            </div>\n")
+        parts.append("        </div>\n\n")
+    parts.append(_SWAGGER_HTML_TAIL)
+    return "".join(parts)
+
+
+# The page is static, so it is encoded, compressed and wrapped in reusable responses once.
+_SWAGGER_HTML_BYTES = generate_swagger_html().encode("utf-8")
+_SWAGGER_HTML_ETAG = f'"{hashlib.sha256(_SWAGGER_HTML_BYTES).hexdigest()[:32]}"'
+_SWAGGER_HTML_GZIP_ETAG = _SWAGGER_HTML_ETAG[:-1] + '-gzip"'
+_SWAGGER_HTML_HEADERS = {
+    "ETag": _SWAGGER_HTML_ETAG,
+    "Cache-Control": _DOCS_CACHE_CONTROL,
+    "Last-Modified": _DOCS_LAST_MODIFIED,
+    "Vary": "Accept-Encoding",
+}
+_SWAGGER_HTML_GZIP_HEADERS = {**_SWAGGER_HTML_HEADERS, "ETag": _SWAGGER_HTML_GZIP_ETAG}
+_SWAGGER_HTML_RESPONSE = _ReusableResponse(_SWAGGER_HTML_BYTES, media_type="text/html", headers=_SWAGGER_HTML_HEADERS)
+_SWAGGER_HTML_GZIP_RESPONSE = _ReusableResponse(
+    gzip.compress(_SWAGGER_HTML_BYTES, compresslevel=9),
+    media_type="text/html",
+    headers={**_SWAGGER_HTML_GZIP_HEADERS, "Content-Encoding": "gzip"},
+)
+_SWAGGER_HTML_NOT_MODIFIED = _ReusableResponse(status_code=304, headers=_SWAGGER_HTML_HEADERS)
+_SWAGGER_HTML_GZIP_NOT_MODIFIED = _ReusableResponse(status_code=304, headers=_SWAGGER_HTML_GZIP_HEADERS)
 
 
 async def swagger_ui_handler(request: Request) -> Response:
-    """Serve the Swagger UI HTML page."""
-    html = generate_swagger_html()
-    return HTMLResponse(html)
+    """Serve the Swagger UI HTML page, answering revalidations with 304."""
+    if _accepts_gzip(request):
+        if _not_modified(request, _SWAGGER_HTML_GZIP_ETAG):
+            return _SWAGGER_HTML_GZIP_NOT_MODIFIED
+        return _SWAGGER_HTML_GZIP_RESPONSE
+    if _not_modified(request, _SWAGGER_HTML_ETAG):
+        return _SWAGGER_HTML_NOT_MODIFIED
+    return _SWAGGER_HTML_RESPONSE
 
 
 async def openapi_json_handler(request: Request) -> Response:
-    """Serve the comprehensive OpenAPI JSON schema."""
-    schema = generate_openapi_schema(request)
-    return JSONResponse(schema)
+    """Serve the comprehensive OpenAPI JSON schema, answering revalidations with 304."""
+    base_url = request_base_url(request)
+    gzipped = _accepts_gzip(request)
+    not_modified = _not_modified(request, _openapi_etag(base_url, gzipped))
+    return _openapi_response(base_url, gzipped, not_modified)
@@ -0,0 +1,67 @@
+"""Streaming chat replies release their session waiter however the response ends."""
+
+from __future__ import annotations
+
+import asyncio
+
+import orjson
+import pytest
+
+from app.config import load_settings
+from app.server import _build_websocket_app, build_server
+from app.server_components.state import pending_responses
+
+
+class _SilentClient:
+    """Accepts prompts and never calls back."""
+
+    async def start_message(self, payload):
+        return {"ok": True}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_WEBHOOK_URL", "http://localhost:9/webhook")
+    monkeypatch.setenv("CONVERSATION_DB_PATH", str(tmp_path / "conversations.db"))
+    settings = load_settings()
+    client = _SilentClient()
+    return _build_websocket_app(build_server(settings, client=client), settings, client=client)
+
+
+def _chat_scope(body: bytes) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/v1/chat/completions",
+        "raw_path": b"/v1/chat/completions",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+
+def test_stream_waiter_is_released_when_headers_cannot_be_sent(app):
+    body = orjson.dumps(
+        {"messages": [{"role": "user", "content": "hi"}], "session_id": "gone-client", "stream": True}
+    )
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("client went away")
+
+    async def scenario():
+        try:
+            await app(_chat_scope(body), receive, send)
+        except Exception:
+            pass
+
+    asyncio.run(scenario())
+    assert "gone-client" not in pending_responses
@@ -0,0 +1,45 @@
+"""Shutdown behaviour of the frontend webhook dispatcher."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.server_components.response_handler import FrontendWebhookDispatcher
+
+
+def test_aclose_gives_up_on_a_stalled_frontend():
+    async def scenario() -> tuple[float, int]:
+        dispatcher = FrontendWebhookDispatcher("http://frontend.invalid/hook", workers=1, drain_timeout=0.2)
+
+        async def stalled_post(payload):
+            await asyncio.sleep(3600)
+
+        dispatcher._post = stalled_post
+        for i in range(5):
+            dispatcher.submit({"n": i})
+        started = time.monotonic()
+        await dispatcher.aclose()
+        return time.monotonic() - started, dispatcher._queue.qsize()
+
+    elapsed, remaining = asyncio.run(scenario())
+    assert elapsed < 2
+    assert remaining == 0
+
+
+def test_aclose_delivers_queued_payloads_when_the_frontend_keeps_up():
+    delivered = []
+
+    async def scenario() -> None:
+        dispatcher = FrontendWebhookDispatcher("http://frontend.invalid/hook", workers=2)
+
+        async def post(payload):
+            delivered.append(payload["n"])
+
+        dispatcher._post = post
+        for i in range(5):
+            dispatcher.submit({"n": i})
+        await dispatcher.aclose()
+
+    asyncio.run(scenario())
+    assert sorted(delivered) == [0, 1, 2, 3, 4]
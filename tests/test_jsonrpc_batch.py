@@ -0,0 +1,75 @@
+"""JSON-RPC batch handling on the memory app's HTTP endpoint."""
+
+from __future__ import annotations
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.config import load_settings
+from app.server import _build_memory_websocket_app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_WEBHOOK_URL", "http://localhost:9/webhook")
+    monkeypatch.setenv("CONVERSATION_DB_PATH", str(tmp_path / "conversations.db"))
+    settings = load_settings(mcp_max_batch_size=4)
+    with TestClient(_build_memory_websocket_app(settings)) as test_client:
+        yield test_client
+
+
+def _post(client: TestClient, body):
+    return client.post("/mcp/hook", json=body)
+
+
+def test_empty_batch_is_invalid_request(client):
+    response = _post(client, [])
+    assert response.status_code == 400
+    assert response.json() == {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+
+
+def test_batch_over_max_size_is_rejected(client):
+    batch = [{"jsonrpc": "2.0", "id": i, "method": "tools/list"} for i in range(5)]
+    response = _post(client, batch)
+    assert response.status_code == 400
+    body = response.json()
+    assert body["id"] is None
+    assert body["error"]["code"] == -32600
+
+
+def test_notification_only_batch_returns_no_content(client):
+    batch = [
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "method": "notifications/cancelled"},
+    ]
+    response = _post(client, batch)
+    assert response.status_code == 204
+    assert response.content == b""
+
+
+def test_mixed_batch_answers_each_request_in_order(client):
+    batch = [
+        {"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+        1,
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "id": 2, "method": "no/such/method"},
+    ]
+    response = _post(client, batch)
+    assert response.status_code == 200
+    replies = response.json()
+    assert [reply["id"] for reply in replies] == [1, None, 2]
+    assert "tools" in replies[0]["result"]
+    assert replies[1]["error"]["code"] == -32600
+    assert replies[2]["error"]["code"] == -32601
+
+
+def test_non_object_message_is_invalid_request(client):
+    response = _post(client, 5)
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == -32600
+
+
+def test_malformed_body_is_parse_error(client):
+    response = client.post("/mcp/hook", content=b"{not json")
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == -32700
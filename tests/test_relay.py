@@ -0,0 +1,129 @@
+"""Redis relay resource handling and fallbacks, against an in-memory stand-in for redis."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.config import load_settings
+from app.server import _build_websocket_app, build_server
+from app.server_components.relay import RedisResponseRelay
+from app.server_components.response_handler import build_response_handler
+from app.server_components.state import deliver_pending
+
+
+class _FakePubSub:
+    def __init__(self, subscribe_delay: float = 0.0) -> None:
+        self.subscribe_delay = subscribe_delay
+        self.closed = False
+
+    async def subscribe(self, channel: str) -> None:
+        await asyncio.sleep(self.subscribe_delay)
+
+    async def listen(self):
+        await asyncio.Event().wait()
+        yield {}  # pragma: no cover - never reached
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class _FakeRedis:
+    def __init__(self, *, subscribe_delay: float = 0.0, publish_delay: float = 0.0) -> None:
+        self.subscribe_delay = subscribe_delay
+        self.publish_delay = publish_delay
+        self.pubsubs: list[_FakePubSub] = []
+
+    def pubsub(self, **_: object) -> _FakePubSub:
+        pubsub = _FakePubSub(self.subscribe_delay)
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+    async def publish(self, channel: str, data: bytes) -> int:
+        await asyncio.sleep(self.publish_delay)
+        return 0
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _relay(redis: _FakeRedis, timeout: float = 0.1) -> RedisResponseRelay:
+    # The redis package is optional, so bypass __init__ and plug in the stand-in.
+    relay = RedisResponseRelay.__new__(RedisResponseRelay)
+    relay.url = "redis://fake"
+    relay.channel_prefix = "test:"
+    relay.timeout = timeout
+    relay._redis = redis
+    return relay
+
+
+def test_closing_a_subscription_before_it_runs_closes_the_pubsub():
+    redis = _FakeRedis()
+
+    async def scenario() -> None:
+        subscription = await _relay(redis).subscribe("s")
+        await subscription.aclose()
+        await subscription.aclose()
+
+    asyncio.run(scenario())
+    assert redis.pubsubs[0].closed
+
+
+def test_stalled_subscribe_times_out_and_closes_the_pubsub():
+    redis = _FakeRedis(subscribe_delay=10)
+
+    async def scenario() -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await _relay(redis).subscribe("s")
+
+    asyncio.run(scenario())
+    assert redis.pubsubs[0].closed
+
+
+def test_stalled_publish_does_not_fail_the_callback(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_WEBHOOK_URL", "http://localhost:9/webhook")
+    monkeypatch.setenv("CONVERSATION_DB_PATH", str(tmp_path / "conversations.db"))
+    handler = build_response_handler(load_settings(), dispatcher=None, relay=_relay(_FakeRedis(publish_delay=10)))
+
+    async def scenario() -> None:
+        await asyncio.wait_for(handler({"session_id": "nobody-waiting", "payload": {"message": "hi"}}), timeout=2)
+
+    asyncio.run(scenario())
+
+
+class _FailingRelay:
+    async def subscribe(self, session_id: str):
+        raise ConnectionError("redis is down")
+
+    async def publish(self, session_id: str, payload: dict) -> int:
+        raise ConnectionError("redis is down")
+
+    async def aclose(self) -> None:
+        pass
+
+
+class _EchoClient:
+    """Replies to each prompt in-process, as a backend callback reaching this worker would."""
+
+    async def start_message(self, payload):
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, deliver_pending, payload["sessionID"], {"message": "pong"})
+        return {"ok": True}
+
+
+def test_chat_falls_back_to_local_delivery_when_redis_is_down(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_WEBHOOK_URL", "http://localhost:9/webhook")
+    monkeypatch.setenv("CONVERSATION_DB_PATH", str(tmp_path / "conversations.db"))
+    settings = load_settings()
+    client, relay = _EchoClient(), _FailingRelay()
+    server = build_server(settings, client=client, relay=relay)
+    app = _build_websocket_app(server, settings, client=client, relay=relay)
+    with TestClient(app) as test_client:
+        response = test_client.post(
+            "/v1/chat/completions",
+            json={"messages": [{"role": "user", "content": "ping"}], "session_id": "redis-down"},
+        )
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["content"] == "pong"
@@ -0,0 +1,31 @@
+"""Retention sweeps keep the denormalized message counts in step."""
+
+from __future__ import annotations
+
+from app.storage import ConversationStore
+
+
+def _age_messages(store: ConversationStore, where: str) -> None:
+    with store._transaction() as conn:
+        conn.execute(f"UPDATE messages SET created_at = datetime('now', '-40 days') WHERE {where}")
+
+
+def test_delete_old_messages_adjusts_only_affected_sessions(tmp_path):
+    store = ConversationStore(tmp_path / "conversations.db")
+    for session_id, count in (("old", 3), ("mixed", 4), ("new", 2)):
+        store.record_messages(session_id, [("user", f"{session_id}{i}", None) for i in range(count)])
+    _age_messages(store, "session_id = 'old' OR content IN ('mixed0', 'mixed1')")
+
+    assert store.delete_old_messages(30) == 5
+
+    counts = {session["session_id"]: session["message_count"] for session in store.list_sessions()}
+    assert counts == {"mixed": 2, "new": 2}
+    assert [message.content for message in store.get_messages("mixed")] == ["mixed2", "mixed3"]
+
+
+def test_delete_old_messages_without_expired_rows_is_a_no_op(tmp_path):
+    store = ConversationStore(tmp_path / "conversations.db")
+    store.record_message("s", "user", "hi")
+
+    assert store.delete_old_messages(30) == 0
+    assert store.list_sessions()[0]["message_count"] == 1